@@ -0,0 +1,126 @@
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from difflib import get_close_matches
+
+import config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    label TEXT NOT NULL,
+    field_type TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    uses INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT,
+    PRIMARY KEY (label, field_type)
+);
+"""
+
+
+# Only choices and short factual answers are remembered, free text is written for one employer
+REMEMBERED_TYPES = {"radio", "checkbox", "select-one", "number"}
+
+
+def normalize_label(label: str) -> str:
+    """Normalize a question label so the same screener question matches across employers."""
+    label = label.lower()
+    label = re.sub(r'\(optional\)|\*', ' ', label)
+    label = re.sub(r'[^a-z0-9 ]+', ' ', label)
+    return re.sub(r'\s+', ' ', label).strip()
+
+
+class AnswerMemory:
+    """Persistent memory of answers to application questions, keyed by normalized label and field type.
+
+    Only fields of REMEMBERED_TYPES are remembered and recalled.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+
+    def lookup(self, label: str, field_type: str):
+        if not label or field_type not in REMEMBERED_TYPES:
+            return None
+        with self.lock:
+            row = self.connection.execute("SELECT answer FROM answers WHERE label = ? AND field_type = ?",
+                                          (normalize_label(label), field_type)).fetchone()
+        return row[0] if row else None
+
+    def remember(self, form_fields: list, question_answer_pairs: dict) -> None:
+        """Store the answers returned by extract_question_answer_pairs for the given form fields.
+
+        Call it once the page was accepted, so answers the employer rejected are not kept.
+        """
+        updated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self.lock:
+            for field in form_fields:
+                label = field.get("label")
+                if "headings" in field or not label or label not in question_answer_pairs \
+                        or field["type"] not in REMEMBERED_TYPES:
+                    continue
+                answer = question_answer_pairs[label]
+                if not answer:
+                    continue
+                self.connection.execute(
+                    """INSERT INTO answers (label, field_type, answer, uses, updated_at) VALUES (?, ?, ?, 0, ?)
+                       ON CONFLICT (label, field_type) DO UPDATE SET answer = excluded.answer,
+                       updated_at = excluded.updated_at""",
+                    (normalize_label(label), field["type"], answer, updated_at))
+            self.connection.commit()
+
+    def recall(self, form_fields: list):
+        """Split the form fields into remembered answers and fields that still need the LLM.
+
+        Returns ({field_id: value}, unknown_fields). Headings are kept in unknown_fields for context.
+        """
+        known = {}
+        unknown_fields = []
+        used_labels = []
+        for field in form_fields:
+            if "headings" in field:
+                unknown_fields.append(field)
+                continue
+            answer = self.lookup(field.get("label"), field["type"])
+            if answer is None:
+                unknown_fields.append(field)
+                continue
+
+            if "options" in field:
+                # Radio and checkbox groups are answered with the id of the matching option
+                option_labels = [normalize_label(option["label"]) for option in field["options"]]
+                match = get_close_matches(normalize_label(answer), option_labels, n=1, cutoff=0.8)
+                if not match:
+                    unknown_fields.append(field)
+                    continue
+                option = field["options"][option_labels.index(match[0])]
+                known[option["id"]] = option["label"]
+            else:
+                known[field["id"]] = answer
+            used_labels.append((normalize_label(field["label"]), field["type"]))
+
+        if used_labels:
+            with self.lock:
+                self.connection.executemany(
+                    "UPDATE answers SET uses = uses + 1 WHERE label = ? AND field_type = ?", used_labels)
+                self.connection.commit()
+        return known, unknown_fields
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_answer_memory():
+    """Return the shared answer memory, or None when it is turned off in config.py."""
+    global _memory
+    if config.answer_memory.lower() != "yes":
+        return None
+    with _memory_lock:
+        if _memory is None:
+            _memory = AnswerMemory(config.answer_memory_db)
+        return _memory
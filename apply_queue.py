@@ -0,0 +1,157 @@
+import os
+import random
+import threading
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+import config
+import pacing
+import tracing
+from browser_pool import clone_profile
+from form_processor import NOT_SUBMITTED, apply_for_job, move_html
+from http_crawler import job_page_url
+
+# Queue statuses of the application_queue table
+QUEUED = "queued"
+APPLYING = "applying"
+DONE = "done"
+FAILED = "failed"
+INTERRUPTED = "interrupted"
+
+
+def is_deferred() -> bool:
+    """True when suitable jobs are queued for the apply worker instead of applied for inside the scrape loop."""
+    return config.auto_apply.lower() == "yes" and config.apply_mode.lower() in ("parallel", "later")
+
+
+class ApplyWorker:
+    """Applies for the jobs of the application queue with its own Chrome, at its own pace.
+
+    The scrape loop queues every suitable job with an internal apply button once its resume is written.
+    In "parallel" mode start(bot) runs the worker on a thread next to scraping, with a copy of the Chrome
+    profile, and close() lets it finish the applications that are due. In "later" mode the queue is
+    drained by a separate run of this module. A failed attempt is retried after apply_retry_delay
+    seconds, doubled on every attempt, until apply_max_attempts attempts have been made. A form filled
+    up to the review page with final_apply_button off is not retried.
+    """
+
+    def __init__(self, store) -> None:
+        self.store = store
+        self.stopping = threading.Event()
+        self.thread = None
+        self.applied = 0
+        self.not_submitted = 0
+        self.failed = 0
+
+    def recover(self) -> None:
+        """Applications in progress when the last worker stopped may have been sent, they are left for a manual check."""
+        for job_id in self.store.interrupt_applications():
+            print(f"The application for job {job_id} was interrupted, check it on Indeed")
+            self.store.save_application(job_id, None, "Interrupted")
+
+    @tracing.traced("queued_application")
+    def apply_next(self, bot) -> bool:
+        """Apply for the next due job of the queue with the browser of bot, False when nothing is due."""
+        record = self.store.claim_application(time.time())
+        if record is None:
+            return False
+        job_id = record["job_id"]
+        print(f"Applying for queued job {job_id} (attempt {record['attempts']})")
+
+        status, gpt_answer, error = "Failed", None, None
+        try:
+            if not os.path.exists(record["resume_path"]):
+                error = f"Resume {record['resume_path']} not found"
+            else:
+                bot.browser.get(job_page_url(config.indeed_base_url, job_id))
+                button = pacing.wait_for(bot.browser, EC.element_to_be_clickable((By.ID, "indeedApplyButton")))
+                if button is None:
+                    error = "Internal apply button not found"
+                else:
+                    pacing.humanize("page")
+                    with bot.apply_lock:
+                        gpt_answer, status = apply_for_job(bot.browser, button,
+                                                           resume_file_name=record["resume_path"])
+                        move_html(record["job_title"], job_id)
+                    if status not in ("Success", NOT_SUBMITTED):
+                        error = f"Application status {status}"
+        except Exception as e:
+            # A page that fails to load is retried like a failed application, the worker goes on with the queue
+            status, error = "Failed", f"{type(e).__name__}: {e}"
+
+        if status == "Success":
+            self.store.update_application(job_id, DONE)
+            self.store.save_application(job_id, gpt_answer, status)
+            self.applied += 1
+        elif status == NOT_SUBMITTED:
+            # final_apply_button is off, filling the form again would not send it either
+            print(f"Application for job {job_id} filled, not submitted")
+            self.store.update_application(job_id, DONE)
+            self.store.save_application(job_id, gpt_answer, status)
+            self.not_submitted += 1
+        elif record["attempts"] < config.apply_max_attempts:
+            delay = config.apply_retry_delay * 2 ** (record["attempts"] - 1)
+            print(f"Application for job {job_id} failed ({error}), retrying in {delay} s")
+            # The job keeps its "Queued" status until the last attempt
+            self.store.update_application(job_id, QUEUED, time.time() + delay, error)
+        else:
+            print(f"Application for job {job_id} failed ({error}), giving up after {record['attempts']} attempts")
+            self.store.update_application(job_id, FAILED, error=error)
+            self.store.save_application(job_id, gpt_answer, status)
+            self.failed += 1
+        return True
+
+    def drain(self, bot, wait: bool = False) -> None:
+        """Apply for the due jobs, with wait also for jobs queued later until close() is called."""
+        while True:
+            if self.apply_next(bot):
+                low, high = config.apply_interval
+                tracing.sleep(random.uniform(low, high), "apply_interval")
+            elif wait and not self.stopping.is_set():
+                self.stopping.wait(2)
+            else:
+                return
+
+    def _run(self, bot) -> None:
+        profile_dir = clone_profile(os.path.join(os.getcwd(), config.chrome_profile_dir),
+                                    os.path.join(config.browser_profiles_folder, "apply-worker"))
+        try:
+            worker = bot.spawn_worker(profile_dir)
+        except Exception as e:
+            print(f"Apply worker failed to start, the queued jobs are left for a later run: {e}")
+            return
+        try:
+            worker.click_reject_all_button()
+            self.drain(worker, wait=True)
+        finally:
+            worker.browser.quit()
+
+    def start(self, bot) -> None:
+        """Start applying on a thread with its own Chrome, next to the scraping of bot."""
+        self.recover()
+        self.thread = threading.Thread(target=self._run, args=(bot,), name="apply-worker", daemon=True)
+        self.thread.start()
+
+    def close(self) -> None:
+        """Apply for the jobs that are due and stop, jobs waiting for a retry stay queued for a later run."""
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        print(f"Apply worker finished: {self.applied} applied, {self.not_submitted} not submitted, "
+              f"{self.failed} failed, queue {self.store.application_queue_counts()}")
+
+
+if __name__ == "__main__":
+    # Apply for the jobs queued by earlier runs with apply_mode = "later", in the main Chrome profile
+    from main import IndeedAutoApplyBot
+
+    bot = IndeedAutoApplyBot()
+    worker = ApplyWorker(bot.store)
+    worker.recover()
+    bot.click_reject_all_button()
+    worker.drain(bot)
+    worker.close()
+    bot.store.close()
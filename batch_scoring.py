@@ -0,0 +1,189 @@
+import json
+import sys
+
+import requests
+
+import config
+from job_store import JobStore
+from response_cache import get_response_cache, cache_key
+from tracing import traced
+from llm_client import get_llm_client, extract_json_from_text
+from token_usage import get_token_usage, estimate_tokens, trim_to_tokens
+
+MODEL = "gpt-4o-mini"  # Replace with the model you have access to
+
+# Instructions and profile first, so every batch request starts with the same prefix
+BATCH_SYSTEM_PROMPT = """You are a helpful assistant that determines the suitability of my profile with several job descriptions.
+                    The user message contains job descriptions, each one starting with its job ID.
+                    For each job decide if I am a suitable match.
+                    If No, the value for the job is a JSON object containing "suitable":"No".
+                    If Yes, based on the job description and profile write a small profile section and a skill section for a cv
+                    with relevant keywords so that it will get detected by ATS. The value for the job is a JSON object
+                    containing "suitable":"Yes", "profile":"", "skills":"".
+                    Respond with a single JSON object whose keys are the job IDs. Output only the JSON.
+
+                    My profile: {profile}
+                    """
+
+BATCH_PROMPT = """Job descriptions:
+{job_descriptions}"""
+
+# Marks jobs recorded in offline mode that still wait for the batch results file
+PENDING_SUITABILITY = "Pending batch"
+
+
+def build_batch_request(jobs: dict) -> dict:
+    """Build the chat completion body scoring every job of {job_id: job_description} in one request."""
+    job_descriptions = "\n\n".join(f"Job ID: {job_id}\n{trim_to_tokens(description)}"
+                                   for job_id, description in jobs.items())
+    return {
+        "model": MODEL,
+        "messages": [
+            {"role": "system", "content": BATCH_SYSTEM_PROMPT.format(profile=config.profile)},
+            {"role": "user", "content": BATCH_PROMPT.format(job_descriptions=job_descriptions)}
+        ],
+        "max_tokens": 600 * len(jobs),
+        "response_format": {"type": "json_object"},
+        "temperature": 1.0
+    }
+
+
+def parse_batch_message(message: str, job_ids) -> dict:
+    """Map the JSON answer of a batch request to a verdict per job ID."""
+    json_string = extract_json_from_text(message)
+    answer = json.loads(json_string) if json_string else {}
+
+    verdicts = {}
+    for job_id in job_ids:
+        verdict = answer.get(job_id)
+        if isinstance(verdict, dict) and "suitable" in verdict:
+            verdicts[job_id] = verdict
+        else:
+            verdicts[job_id] = {"error": "Missing from batch response", "message": message}
+    return verdicts
+
+
+def _job_cache_key(description: str) -> str:
+    return cache_key(MODEL, BATCH_SYSTEM_PROMPT, BATCH_PROMPT, config.profile, description)
+
+
+@traced()
+def ask_chatgpt_batch(jobs: dict) -> dict:
+    """Score several jobs with a single request and return {job_id: verdict}.
+
+    The profile is sent once per batch instead of once per job. Cached verdicts are reused and only
+    the remaining jobs are sent.
+    """
+    cache = get_response_cache()
+    verdicts = {}
+    if cache is not None:
+        for job_id, description in jobs.items():
+            cached_verdict = cache.get(_job_cache_key(description))
+            if cached_verdict is not None:
+                verdicts[job_id] = json.loads(cached_verdict)
+                get_token_usage().record_cache_hit("batch", estimate_tokens(trim_to_tokens(description)))
+    missing = {job_id: description for job_id, description in jobs.items() if job_id not in verdicts}
+    if not missing:
+        return verdicts
+
+    try:
+        data = build_batch_request(missing)
+        answer = get_llm_client().chat(data, timeout=10 + 5 * len(missing))
+        get_token_usage().record("batch", answer.get("usage"))
+        message = answer['choices'][0]['message']['content'].strip()
+    except requests.exceptions.RequestException as e:
+        for job_id in missing:
+            verdicts[job_id] = {"error": "Request error", "message": str(e)}
+        return verdicts
+
+    for job_id, verdict in parse_batch_message(message, missing).items():
+        verdicts[job_id] = verdict
+        if cache is not None and "error" not in verdict:
+            cache.put(_job_cache_key(missing[job_id]), json.dumps(verdict))
+    return verdicts
+
+
+def write_batch_file(jobs: dict, batch_path: str, batch_size: int = None) -> int:
+    """Write an OpenAI Batch API input file, each line scoring batch_size jobs, and return the line count."""
+    batch_size = batch_size or config.scoring_batch_size
+    job_ids = list(jobs)
+    lines = 0
+    with open(batch_path, mode='w', encoding='utf-8') as file:
+        for start in range(0, len(job_ids), batch_size):
+            chunk = {job_id: jobs[job_id] for job_id in job_ids[start:start + batch_size]}
+            file.write(json.dumps({
+                "custom_id": ",".join(chunk),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": build_batch_request(chunk)
+            }) + "\n")
+            lines += 1
+    print(f"Wrote {len(job_ids)} jobs in {lines} requests to {batch_path}")
+    return lines
+
+
+def read_batch_results(results_path: str) -> dict:
+    """Read an OpenAI Batch API output file and return {job_id: verdict}."""
+    verdicts = {}
+    with open(results_path, mode='r', encoding='utf-8') as file:
+        for line in file:
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            job_ids = result["custom_id"].split(",")
+            response = result.get("response") or {}
+            if response.get("status_code") != 200:
+                for job_id in job_ids:
+                    verdicts[job_id] = {"error": "Batch request failed", "message": json.dumps(result.get("error"))}
+                continue
+            message = response["body"]["choices"][0]["message"]["content"].strip()
+            verdicts.update(parse_batch_message(message, job_ids))
+    return verdicts
+
+
+def export_pending_jobs(store: JobStore, batch_path: str) -> int:
+    """Write the jobs recorded in offline mode to a batch input file."""
+    jobs = {job_id: description for job_id, _, description in store.jobs_with_suitability(PENDING_SUITABILITY)}
+    if not jobs:
+        print("No jobs waiting for batch scoring")
+        return 0
+    return write_batch_file(jobs, batch_path)
+
+
+def ingest_batch_results(store: JobStore, results_path: str) -> int:
+    """Store the verdicts of a batch output file and render the resumes of the suitable jobs."""
+    # Imported here, main imports this module for the online batch mode
+    from main import update_resume_with_json, resume_path_for
+
+    verdicts = read_batch_results(results_path)
+    titles = {job_id: job_title for job_id, job_title, _ in store.jobs_with_suitability(PENDING_SUITABILITY)}
+    count = 0
+    for job_id, verdict in verdicts.items():
+        if job_id not in titles:
+            continue
+        suitability = verdict.get("suitable", "Error")
+        resume_path = None
+        application_status = None
+        if suitability == "Yes":
+            resume_path = update_resume_with_json(verdict, config.template_path,
+                                                  output_path=resume_path_for(titles[job_id], job_id))
+            application_status = "Not applied"
+        store.update_llm_result(job_id, suitability, verdict, resume_path, application_status)
+        count += 1
+    store.flush()
+    print(f"Ingested {count} batch verdicts from {results_path}")
+    return count
+
+
+if __name__ == "__main__":
+    # Usage: python batch_scoring.py write batch_input.jsonl
+    #        python batch_scoring.py ingest batch_output.jsonl
+    if len(sys.argv) != 3 or sys.argv[1] not in ("write", "ingest"):
+        print("Usage: python batch_scoring.py [write|ingest] <file.jsonl>")
+        sys.exit(1)
+    job_store = JobStore(config.job_store_db)
+    if sys.argv[1] == "write":
+        export_pending_jobs(job_store, sys.argv[2])
+    else:
+        ingest_batch_results(job_store, sys.argv[2])
+    job_store.close()
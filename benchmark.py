@@ -0,0 +1,157 @@
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+import config
+from fixture_server import generate_fixtures, start_fixture_server
+
+# Settings compared by default, each one is applied on top of BASE_SETTINGS
+CONFIGURATIONS = {
+    "human-inline": {"pacing_profile": "human", "llm_workers": 0},
+    "human-pipeline": {"pacing_profile": "human", "llm_workers": 4},
+    "fast-pipeline": {"pacing_profile": "fast", "llm_workers": 4},
+    "none-pipeline": {"pacing_profile": "none", "llm_workers": 4},
+    "none-batch": {"pacing_profile": "none", "llm_workers": 2, "scoring_mode": "batch"},
+    "none-pool": {"pacing_profile": "none", "llm_workers": 4, "browser_workers": 2},
+    "none-fast-browser": {"pacing_profile": "none", "llm_workers": 4, "fast_browser": "Yes"},
+    "http": {"crawl_engine": "http", "llm_workers": 4}
+}
+
+# Keeps the runs independent of each other and of the files of a real run
+BASE_SETTINGS = {
+    "api_key": "benchmark",
+    "auto_apply": "No",
+    "export_csv": "No",
+    "openai_cache": "No",
+    "answer_memory": "No",
+    "checkpointing": "No",
+    "tracing": "No",
+    "prefilter": "No",
+    "near_duplicates": "No",
+    "headless": "Yes",
+    "fast_browser": "No",
+    "scoring_mode": "single",
+    "crawl_engine": "browser",
+    "browser_workers": 1
+}
+
+
+class CommandCounter:
+    """Counts the WebDriver commands sent by every browser while installed."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.lock = threading.Lock()
+        self.original = WebDriver.execute
+
+    def install(self) -> None:
+        counter = self
+
+        def execute(driver, driver_command, params=None):
+            with counter.lock:
+                counter.count += 1
+            return counter.original(driver, driver_command, params)
+
+        WebDriver.execute = execute
+
+    def uninstall(self) -> None:
+        WebDriver.execute = self.original
+
+
+def run_configuration(name: str, settings: dict, server_url: str, stats: dict, keywords: list) -> dict:
+    """Scrape the fixture site with one configuration and return its measurements."""
+    # Imported here so config.py changes made by the caller are seen by the modules main imports
+    from main import IndeedAutoApplyBot
+
+    work_folder = tempfile.mkdtemp(prefix=f"benchmark-{name}-")
+    overrides = dict(BASE_SETTINGS, **settings)
+    overrides.update({
+        "indeed_homepage_url": f"{server_url}/",
+        "indeed_base_url": server_url,
+        "openai_base_url": f"{server_url}/v1",
+        "template_path": os.path.abspath(config.template_path),
+        "job_store_db": os.path.join(work_folder, "job_store.db"),
+        "resume_folder": os.path.join(work_folder, "Resumes"),
+        # Empty profiles, the browsers must not start from a copy of the user's Chrome profile
+        "chrome_profile_dir": os.path.join(work_folder, "chrome_profile"),
+        "browser_profiles_folder": os.path.join(work_folder, "chrome_profiles"),
+        "job_search_keywords": keywords
+    })
+    saved = {key: getattr(config, key) for key in overrides}
+    for key, value in overrides.items():
+        setattr(config, key, value)
+
+    counter = CommandCounter()
+    counter.install()
+    openai_requests = stats["openai_requests"]
+    started = time.perf_counter()
+    try:
+        if config.crawl_engine == "http":
+            bot = IndeedAutoApplyBot(launch_browser=False)
+            bot.crawl_job_listings(keywords)
+        elif config.browser_workers > 1:
+            bot = IndeedAutoApplyBot(launch_browser=False)
+            bot.pool_job_listings(keywords)
+        else:
+            bot = IndeedAutoApplyBot()
+            bot.scrape_job_listings(keywords)
+            bot.browser.quit()
+        elapsed = time.perf_counter() - started
+        jobs = sum(1 for _ in bot.store.iter_rows(bot.run_id))
+        bot.store.close()
+    finally:
+        counter.uninstall()
+        for key, value in saved.items():
+            setattr(config, key, value)
+        shutil.rmtree(work_folder, ignore_errors=True)
+
+    llm_calls = stats["openai_requests"] - openai_requests
+    return {
+        "name": name,
+        "jobs": jobs,
+        "seconds": elapsed,
+        "jobs_per_minute": jobs / (elapsed / 60) if elapsed else 0.0,
+        "webdriver_calls_per_job": counter.count / jobs if jobs else 0.0,
+        "llm_calls_per_job": llm_calls / jobs if jobs else 0.0
+    }
+
+
+def print_results(results: list) -> None:
+    print(f"{'configuration':<18}{'jobs':>6}{'seconds':>10}{'jobs/min':>10}{'WebDriver/job':>15}{'LLM/job':>9}")
+    for result in results:
+        print(f"{result['name']:<18}{result['jobs']:>6}{result['seconds']:>10.1f}{result['jobs_per_minute']:>10.1f}"
+              f"{result['webdriver_calls_per_job']:>15.1f}{result['llm_calls_per_job']:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scrape pipeline against a local copy of Indeed")
+    parser.add_argument("configurations", nargs="*", default=list(CONFIGURATIONS),
+                        help=f"configurations to run, from {', '.join(CONFIGURATIONS)}")
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--jobs-per-page", type=int, default=15)
+    parser.add_argument("--keywords", type=int, default=1, help="number of searches per run")
+    parser.add_argument("--openai-latency", type=float, default=1.0, help="seconds the stub OpenAI endpoint waits")
+    parser.add_argument("--port", type=int, default=0, help="port of the fixture server, 0 picks a free one")
+    args = parser.parse_args()
+
+    fixtures_folder = tempfile.mkdtemp(prefix="benchmark-fixtures-")
+    generate_fixtures(fixtures_folder, args.pages, args.jobs_per_page)
+    server = start_fixture_server(args.port, fixtures_folder, openai_latency=args.openai_latency)
+    server_url = f"http://127.0.0.1:{server.server_port}"
+    keywords = [f"Benchmark Search {index + 1}" for index in range(args.keywords)]
+
+    results = []
+    try:
+        for configuration in args.configurations:
+            print(f"Running {configuration}")
+            results.append(run_configuration(configuration, CONFIGURATIONS[configuration], server_url,
+                                             server.RequestHandlerClass.stats, keywords))
+    finally:
+        server.shutdown()
+        shutil.rmtree(fixtures_folder, ignore_errors=True)
+    print_results(results)
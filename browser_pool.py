@@ -0,0 +1,113 @@
+import os
+import queue
+import shutil
+import threading
+
+import config
+from http_crawler import search_page_url
+
+# Files Chrome keeps locked while a profile is open, and caches that are not worth copying
+PROFILE_IGNORE = shutil.ignore_patterns("Singleton*", "lockfile", "*.lock", "Cache", "Code Cache", "GPUCache",
+                                        "ShaderCache", "GrShaderCache", "Crashpad")
+
+
+def clone_profile(source_dir: str, target_dir: str) -> str:
+    """Create the profile directory of a worker as a copy of the main Chrome profile, so it keeps the Indeed login."""
+    if os.path.exists(target_dir):
+        return target_dir
+    if os.path.isdir(source_dir):
+        shutil.copytree(source_dir, target_dir, ignore=PROFILE_IGNORE)
+        print(f"Cloned Chrome profile {source_dir} to {target_dir}")
+    else:
+        os.makedirs(target_dir)
+        print(f"Created new Chrome profile directory at {target_dir}")
+    return target_dir
+
+
+class BrowserPool:
+    """Shards the search result pages of a run across several Chrome instances.
+
+    Every (keyword, page) pair is a task on a shared queue. Each worker thread launches its own Chrome
+    with a cloned profile through bot.spawn_worker(profile_dir) and opens the results pages it takes from
+    the queue directly by URL. The workers share the job store, the scoring pipeline and the processed
+    job registry of bot, which hands each job ID to a single worker. Once a page of a keyword comes back
+    empty its later pages are skipped.
+    """
+
+    def __init__(self, bot, workers: int = 2, base_url: str = None) -> None:
+        self.bot = bot
+        self.workers = max(1, workers)
+        self.base_url = base_url or config.indeed_base_url
+        self.tasks = queue.Queue()
+        self.last_pages = {}  # Keyword -> first page that had no jobs or only older ones
+        self.pages_skipped = {}  # Keyword -> pages not opened because of last_pages
+        self.lock = threading.Lock()
+        self.pages_scraped = 0
+        self.failed = 0
+
+    def _is_past_last_page(self, keyword: str, page: int) -> bool:
+        with self.lock:
+            return page >= self.last_pages.get(keyword, config.pagination_limit)
+
+    def _mark_last_page(self, keyword: str, page: int) -> None:
+        with self.lock:
+            self.last_pages[keyword] = min(page, self.last_pages.get(keyword, page))
+
+    def _worker(self, index: int) -> None:
+        profile_dir = clone_profile(os.path.join(os.getcwd(), config.chrome_profile_dir),
+                                    os.path.join(config.browser_profiles_folder, f"worker-{index}"))
+        try:
+            worker = self.bot.spawn_worker(profile_dir)
+        except Exception as e:
+            print(f"Browser worker {index} failed to start: {e}")
+            with self.lock:
+                self.failed += 1
+            return
+
+        try:
+            worker.click_reject_all_button()
+            while True:
+                try:
+                    keyword, page = self.tasks.get_nowait()
+                except queue.Empty:
+                    return
+                if self._is_past_last_page(keyword, page):
+                    with self.lock:
+                        self.pages_skipped[keyword] = self.pages_skipped.get(keyword, 0) + 1
+                    continue
+                # Pages are taken out of order, so the run of processed jobs is counted per page
+                worker.known_streak = 0
+                try:
+                    cards = worker.scrape_search_page(search_page_url(self.base_url, keyword, page))
+                except Exception as e:
+                    print(f"Browser worker {index} failed on '{keyword}' page {page + 1}: {e}")
+                    continue
+                print(f"Browser worker {index}: '{keyword}' page {page + 1}, {cards} jobs")
+                with self.lock:
+                    self.pages_scraped += 1
+                if cards == 0:
+                    self._mark_last_page(keyword, page)
+                elif worker.reached_known_jobs():
+                    self._mark_last_page(keyword, page + 1)
+        finally:
+            worker.browser.quit()
+
+    def run(self, keywords: list) -> None:
+        """Scrape pagination_limit results pages of every keyword and return once all workers are done."""
+        # Pages of the same keyword are queued together, so the workers start on different pages
+        for keyword in keywords:
+            for page in range(config.pagination_limit):
+                self.tasks.put((keyword, page))
+
+        threads = []
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, args=(index,), name=f"browser-worker-{index}",
+                                      daemon=True)
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        print(f"Browser pool finished: {self.pages_scraped} pages scraped by {self.workers} workers, "
+              f"{self.failed} workers failed to start")
+        if self.pages_skipped:
+            print(f"Pages not opened after an empty page or jobs processed by earlier runs: {self.pages_skipped}")
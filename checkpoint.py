@@ -0,0 +1,62 @@
+from datetime import datetime
+
+
+class RunCheckpoint:
+    """Persistent cursor of the browser scrape loop, so a run stopped by a crash continues where it was.
+
+    The keyword and results page being scraped are saved in the job store, and so is a job whose
+    application is in progress. Cards of the saved page that were already handed off are skipped on
+    resume because they are stored or pending. The cursor is cleared when the run finishes normally. Jobs waiting for
+    the scoring workers are kept in the store separately, see IndeedAutoApplyBot.resume_pending_jobs.
+    """
+
+    def __init__(self, store, run_id: int, keywords: list) -> None:
+        self.store = store
+        self.run_id = run_id
+        self.keywords = list(keywords)
+        self.keyword_index = 0
+        self.page = 0
+        self.application = None
+
+    def resume_point(self):
+        """Return (keyword index, page) to start from, (0, 0) unless an unfinished run used the same keywords."""
+        cursor = self.store.load_cursor()
+        if cursor is None or cursor["keywords"] != self.keywords:
+            return 0, 0
+
+        application = cursor["application"]
+        if application is not None and not self.store.is_processed(application["job_id"]):
+            # The application may or may not have been submitted, it is left for a manual check
+            print(f"The application for job {application['job_id']} was interrupted, check it on Indeed")
+            application.update({
+                "date_recorded": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                "suitability": "Yes",
+                "application_status": "Interrupted"
+            })
+            self.store.add_job(application, run_id=self.run_id)
+
+        self.keyword_index, self.page = cursor["keyword_index"], cursor["page"]
+        print(f"Resuming the last run at '{self.keywords[self.keyword_index]}' page {self.page + 1}")
+        return self.keyword_index, self.page
+
+    def save(self) -> None:
+        self.store.save_cursor(self.run_id, self.keywords, self.keyword_index, self.page, self.application)
+
+    def advance(self, keyword_index: int = None, page: int = None) -> None:
+        """Move the cursor to a keyword and results page."""
+        if keyword_index is not None:
+            self.keyword_index = keyword_index
+        if page is not None:
+            self.page = page
+        self.save()
+
+    def start_application(self, record: dict) -> None:
+        self.application = dict(record)
+        self.save()
+
+    def finish_application(self) -> None:
+        self.application = None
+        self.save()
+
+    def finish(self) -> None:
+        self.store.clear_cursor()
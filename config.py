@@ -4,6 +4,14 @@ api_key = ""
 auto_apply = "No"
 final_apply_button = "No"
 
+# How auto_apply applies: "inline" stops scraping for each application, "parallel" queues the suitable jobs for
+# an apply worker with its own Chrome running next to scraping, "later" only queues them for
+# "python apply_queue.py". A failed application is retried apply_retry_delay seconds later, doubled each time.
+apply_mode = "parallel"
+apply_max_attempts = 3
+apply_retry_delay = 300
+apply_interval = (20, 40)  # Pause in seconds (min, max) between two applications of the apply worker
+
 
 profile = """
 Results-driven software engineer with over 8 years of experience specializing in full-stack development, 
@@ -113,17 +121,90 @@ job_search_keywords = [
 ]
 
 pagination_limit = 3
+# Stop paging a keyword after this many consecutive jobs processed by earlier runs, the results are sorted
+# by date so the later pages only hold older jobs (0 always scrapes pagination_limit pages)
+known_jobs_stop = 10
 
 master_csv = "master_job_listings.csv"
 latest_csv = "latest_job_listings.csv"
 
+# SQLite job store, the CSV files above are exported from it at the end of each run
+job_store_db = "job_store.db"
+store_batch_size = 20  # Number of writes grouped into one transaction
+export_csv = "Yes"
+
+# Number of threads scoring jobs with ChatGPT while the browser keeps scraping (0 scores inline)
+llm_workers = 4
+pipeline_queue_size = 16  # Jobs waiting for a worker before the browser loop pauses
+
+# "single" scores one job per request, "batch" scores scoring_batch_size jobs per request and
+# "offline" only records the jobs, run batch_scoring.py to write an OpenAI Batch API file and ingest its results
+scoring_mode = "single"
+scoring_batch_size = 5
+
+# Skip ChatGPT for jobs whose TF-IDF similarity to the profile is below prefilter_threshold, they are
+# stored with the suitability "Pre-filtered". Raise the threshold to send fewer jobs to ChatGPT.
+prefilter = "No"
+prefilter_threshold = 0.03
+
+# Reposts of a job under another Job ID (SimHash of the description within near_duplicate_distance bits)
+# reuse the verdict and resume of the earlier posting
+near_duplicates = "Yes"
+near_duplicate_distance = 3
+
+# Job descriptions are cut to about this many tokens before they are sent to ChatGPT (0 sends them whole)
+description_token_budget = 1500
+
+# "text" asks for JSON in the prompt only, "json" uses structured outputs and "stream" also streams the answer
+# and stops as soon as it reads "suitable":"No"
+suitability_output = "stream"
+
+# Base URL of the OpenAI API, can point to a local stand-in for testing
+openai_base_url = "https://api.openai.com/v1"
+
+# Shared OpenAI client: per minute limits (0 learns them from the rate limit headers), retries on 429/5xx
+# and the timeout of a request in seconds
+openai_requests_per_minute = 0
+openai_tokens_per_minute = 0
+openai_max_retries = 4
+openai_timeout = 30
+
+# On-disk cache of OpenAI responses, keyed by a hash of the model, prompt, profile and job description
+openai_cache = "Yes"
+openai_cache_db = "openai_cache.db"
+openai_cache_max_entries = 5000  # Least recently used answers are evicted above this size
+openai_cache_ttl_days = 30
+
+# Remember answers to application questions so repeated questions are filled without calling OpenAI
+answer_memory = "Yes"
+answer_memory_db = "answer_memory.db"
+
+# Answer the application questions matching a "question: answer" line of profile_answer_questions without
+# OpenAI. A lower threshold (0 to 1) matches more loosely worded questions, and more wrongly.
+question_bank = "Yes"
+question_bank_threshold = 0.75
+
+# "script" reads all form fields of an application page in one call, "webdriver" looks them up one by one
+form_extraction_mode = "script"
+# "script" fills all answers of an application page in one call, "human" scrolls to each field and types the
+# answers one character at a time
+form_fill_mode = "script"
+
 
 chrome_experimental_options = {
     "disable-blink-features": "AutomationControlled",
     "detach": True
 }
 
+headless = "No"  # Run Chrome without a window, used by benchmark.py
+
+# Fast mode blocks images, fonts, media, analytics and ad hosts through the DevTools protocol and starts
+# Chrome with fewer background services. Add more wildcard patterns to block in blocked_url_patterns.
+fast_browser = "No"
+blocked_url_patterns = []
+
 resume_folder = "Resumes"
+resume_workers = 2  # Processes writing the tailored resumes (0 writes them in the scoring thread)
 
 placeholders = {
     "profile_placeholder": "<*profile*>",
@@ -133,6 +214,28 @@ placeholders = {
 # URL for Indeed homepage
 indeed_homepage_url = "https://uk.indeed.com/?from=gnav-homepage&from=gnav-util-homepage"
 
+# Save the keyword, page and card the browser is on, so a crashed run continues from there
+checkpointing = "Yes"
+
+# "browser" clicks through the results in Chrome, "http" fetches search and job pages directly
+crawl_engine = "browser"
+indeed_base_url = "https://uk.indeed.com"  # Used by the http engine, point it at fixture_server.py for testing
+http_concurrency = 4  # Pages fetched at the same time by the http engine
+
+# Number of Chrome instances sharing the results pages of the browser engine (1 uses the single browser)
+browser_workers = 1
+chrome_profile_dir = "chrome_profile"  # Chrome profile of the main browser, keeps the Indeed login
+browser_profiles_folder = "chrome_profiles"  # Each worker gets a copy of chrome_profile_dir in here
+
+# Delays between browser actions: "human" adds short random pauses, "fast" minimal ones and "none" no pauses
+# (for benchmarking). Pages are always waited for until they are ready, at most page_ready_timeout seconds.
+pacing_profile = "human"
+page_ready_timeout = 10
+
+# Write timing spans of every stage to trace_file, summarize them with "python tracing.py"
+tracing = "Yes"
+trace_file = "trace.jsonl"
+
 # Replace text format
 font = 'Times New Roman'
 size = 12
@@ -0,0 +1,60 @@
+from selenium.common.exceptions import WebDriverException
+
+import config
+
+# Requests blocked in fast mode, as Network.setBlockedURLs wildcard patterns. The scraper only reads the
+# text of the results and job pages, so images, fonts, media and the analytics and ad hosts are never
+# needed. Scripts of Indeed and of its captcha provider are left alone, the pages do not work without them.
+BLOCKED_URL_PATTERNS = [
+    # Images
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico", "*.bmp",
+    # Fonts
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    # Audio and video
+    "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.m4a",
+    # Analytics, ads and tag managers
+    "*google-analytics.com*", "*googletagmanager.com*", "*googlesyndication.com*", "*doubleclick.net*",
+    "*googleadservices.com*", "*adservice.google.*", "*facebook.net*", "*connect.facebook.com*",
+    "*bat.bing.com*", "*clarity.ms*", "*hotjar.com*", "*newrelic.com*", "*nr-data.net*", "*segment.io*",
+    "*optimizely.com*", "*quantserve.com*", "*scorecardresearch.com*", "*criteo.com*", "*criteo.net*",
+    "*adnxs.com*", "*taboola.com*", "*outbrain.com*", "*onetrust.com*", "*cookielaw.org*"
+]
+
+# Chrome switches of fast mode: no images at the renderer level and fewer background services per instance
+FAST_ARGUMENTS = [
+    "--blink-settings=imagesEnabled=false",
+    "--mute-audio",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-features=Translate,MediaRouter,OptimizationHints",
+    "--renderer-process-limit=2"
+]
+
+
+def is_enabled() -> bool:
+    return config.fast_browser.lower() == "yes"
+
+
+def add_fast_options(chrome_options) -> None:
+    """Chrome options of fast mode, applied before the browser starts.
+
+    The page load strategy becomes "eager": get() returns once the document is parsed instead of after
+    every subresource, the readiness waits in pacing.py decide when the page can be used.
+    """
+    for argument in FAST_ARGUMENTS:
+        chrome_options.add_argument(argument)
+    chrome_options.page_load_strategy = "eager"
+
+
+def block_resources(driver) -> bool:
+    """Block the resources of BLOCKED_URL_PATTERNS through the DevTools protocol, False when unsupported."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs",
+                               {"urls": BLOCKED_URL_PATTERNS + list(config.blocked_url_patterns)})
+        return True
+    except (AttributeError, WebDriverException) as e:
+        print(f"Could not block resources through the DevTools protocol: {e}")
+        return False
@@ -0,0 +1,282 @@
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# Saved Indeed pages are served from this folder:
+#   index.html                       homepage with the search form
+#   search_<page>.html               results page <page> (0 based) for any keyword
+#   search_<keyword>_<page>.html     results page for one keyword, keyword lower case with "-" for spaces
+#   viewjob_<job id>.html            job page
+FIXTURES_FOLDER = "fixtures"
+
+COMPANIES = ["Tech Solutions Inc.", "Innovatech Solutions", "Cloudworks Ltd", "Bright Apps", "Data Forge"]
+LOCATIONS = ["London", "Manchester", "Remote", "Bristol", "Leeds"]
+SKILLS = ["React", "Node.js", "Python", "AWS", "Docker", "Kubernetes", "Flutter", "PostgreSQL", "Java", "Azure",
+          "Accounting", "Forklift", "Nursing", "Retail", "Carpentry"]
+
+
+def keyword_slug(keyword: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', keyword.lower()).strip('-')
+
+
+def stub_verdict(description: str) -> dict:
+    """Deterministic suitability answer, about a third of the jobs are suitable."""
+    if zlib.crc32(description.encode('utf-8')) % 3:
+        return {"suitable": "No"}
+    return {"suitable": "Yes", "profile": "Experienced engineer with the skills this job asks for.",
+            "skills": "Python, React, AWS, Docker"}
+
+
+def stub_completion(body: dict) -> str:
+    """Answer of the stub OpenAI endpoint: a verdict per job for batch requests, otherwise one verdict."""
+    user_message = body["messages"][-1]["content"]
+    sections = re.split(r'Job ID: (\S+)\n', user_message)
+    if len(sections) > 1:
+        return json.dumps({job_id: stub_verdict(description)
+                           for job_id, description in zip(sections[1::2], sections[2::2])})
+    verdict = stub_verdict(user_message)
+    if "response_format" in body:
+        # Structured outputs always carry every field of the schema
+        verdict = {"suitable": verdict["suitable"], "profile": verdict.get("profile", ""),
+                   "skills": verdict.get("skills", "")}
+    return json.dumps(verdict)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    fixtures_folder = FIXTURES_FOLDER
+    openai_latency = 0.0  # Seconds the stub OpenAI endpoint takes to answer
+    stats = {"openai_requests": 0}
+    stats_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass  # Keep the benchmark output readable
+
+    def send_page(self, name: str) -> None:
+        path = os.path.join(self.fixtures_folder, name)
+        if not os.path.exists(path):
+            self.send_error(404, f"No fixture {name}")
+            return
+        with open(path, mode='rb') as file:
+            body = file.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path in ("/", "/index.html"):
+            self.send_page("index.html")
+        elif url.path == "/jobs":
+            page = int(query.get("start", ["0"])[0]) // 10
+            keyword_page = f"search_{keyword_slug(query.get('q', [''])[0])}_{page}.html"
+            if os.path.exists(os.path.join(self.fixtures_folder, keyword_page)):
+                self.send_page(keyword_page)
+            else:
+                self.send_page(f"search_{page}.html")
+        elif url.path == "/viewjob":
+            self.send_page(f"viewjob_{query.get('jk', [''])[0]}.html")
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        # Stand-in for the OpenAI chat completions endpoint, point config.openai_base_url at <server>/v1
+        if not urlparse(self.path).path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        with self.stats_lock:
+            self.stats["openai_requests"] += 1
+        content = stub_completion(body)
+        prompt_tokens = sum(len(message["content"]) for message in body["messages"]) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                 "total_tokens": prompt_tokens + len(content) // 4, "prompt_tokens_details": {"cached_tokens": 0}}
+        if body.get("stream"):
+            self.send_stream(content, usage)
+            return
+        time.sleep(self.openai_latency)
+
+        answer = json.dumps({
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(answer)))
+        self.end_headers()
+        self.wfile.write(answer)
+
+    def send_stream(self, content: str, usage: dict) -> None:
+        """Server-sent events like a streamed completion: half the latency before the first chunk, the rest
+        spread over the chunks, so a client that stops reading early saves part of it."""
+        chunks = [content[index:index + 8] for index in range(0, len(content), 8)]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        time.sleep(self.openai_latency / 2)
+        try:
+            for chunk in chunks:
+                event = {"choices": [{"index": 0, "delta": {"content": chunk}, "finish_reason": None}]}
+                self.wfile.write(f"data: {json.dumps(event)}\n\n".encode('utf-8'))
+                self.wfile.flush()
+                time.sleep(self.openai_latency / 2 / len(chunks))
+            self.wfile.write(f"data: {json.dumps({'choices': [], 'usage': usage})}\n\ndata: [DONE]\n\n"
+                             .encode('utf-8'))
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client stopped reading
+        self.close_connection = True
+
+
+def start_fixture_server(port: int = 8765, fixtures_folder: str = FIXTURES_FOLDER, handler=FixtureHandler,
+                         openai_latency: float = 0.0):
+    """Start the fixture server on a background thread and return it, call shutdown() to stop it.
+
+    server.RequestHandlerClass.stats counts the requests to the stub OpenAI endpoint.
+    """
+    handler = type("Handler", (handler,), {"fixtures_folder": fixtures_folder, "openai_latency": openai_latency,
+                                           "stats": {"openai_requests": 0}})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Fixture server running on http://127.0.0.1:{server.server_port}")
+    return server
+
+
+# Search form of the homepage and the results pages, find_job searches again from a results page
+SEARCH_FORM_HTML = """<form id="jobsearch" action="/jobs"><div><div><div><div><div>
+  <span><input name="q" value=""><span></span><span>x</span></span>
+</div></div></div></div></div>
+<button type="submit">Find jobs</button></form>
+<a id="dateLabel" href="#">Date</a>"""
+
+
+def search_page_html(page: int, jobs: list, has_next: bool) -> str:
+    """Results page with the card markup the scraper reads. Clicking a card loads the job into the side pane."""
+    cards = []
+    for job in jobs:
+        cards.append(f"""
+<li><div class="job_seen_beacon">
+  <h2 class="jobTitle"><a data-jk="{job['job_id']}" href="/viewjob?jk={job['job_id']}">{job['title']}</a></h2>
+  <span data-testid="company-name">{job['company']}</span>
+  <div data-testid="text-location">{job['location']}</div>
+  <span class="css-qvloho eu4oa1w0">Posted {job['days_ago']} days ago</span>
+</div></li>
+<li><div class="mosaic-afterTenthJobCard"></div></li>""")
+    next_link = f'<a data-testid="pagination-page-next" href="/jobs?q=&start={(page + 1) * 10}">Next</a>' \
+        if has_next else ""
+    return f"""<!DOCTYPE html>
+<html><head><title>Jobs</title></head><body>
+{SEARCH_FORM_HTML}
+<ul class="css-zu9cdh">{''.join(cards)}
+</ul>
+<nav>{next_link}</nav>
+<div id="jobPane"><div id="jobDescriptionText"></div></div>
+<script>
+// The pages are shared by every keyword, the search box and the next link take the keyword of the URL
+const query = new URLSearchParams(location.search).get('q') || '';
+document.querySelector('input[name="q"]').value = query;
+document.querySelectorAll('[data-testid="pagination-page-next"]').forEach((link) => {{
+    const url = new URL(link.href);
+    url.searchParams.set('q', query);
+    link.href = url;
+}});
+document.querySelectorAll('h2.jobTitle a').forEach((link) => link.addEventListener('click', (event) => {{
+    event.preventDefault();
+    // Like Indeed, the URL names the clicked job before its details are rendered
+    const url = new URL(location.href);
+    url.searchParams.set('vjk', link.getAttribute('data-jk'));
+    history.replaceState(null, '', url);
+    fetch(link.getAttribute('href')).then((r) => r.text()).then((html) => {{
+        const page = new DOMParser().parseFromString(html, 'text/html');
+        document.getElementById('jobPane').innerHTML = page.getElementById('jobPane').innerHTML;
+    }});
+}}));
+</script>
+</body></html>"""
+
+
+def job_page_html(job: dict) -> str:
+    if job["internal_apply"]:
+        apply_button = '<button id="indeedApplyButton"><span>Apply now</span></button>'
+    else:
+        apply_button = f'<div id="applyButtonLinkContainer"><button href="https://example.com/apply/{job["job_id"]}">' \
+                       f'<span>Apply on company site</span></button></div>'
+    paragraphs = "".join(f"<p>{line}</p>" for line in job["description"])
+    return f"""<!DOCTYPE html>
+<html><head><title>{job['title']}</title></head><body>
+<div id="jobPane">
+<h1>{job['title']}</h1>
+{apply_button}
+<div id="jobDescriptionText">{paragraphs}</div>
+</div>
+</body></html>"""
+
+
+INDEX_HTML = f"""<!DOCTYPE html>
+<html><head><title>Job Search</title></head><body>
+{SEARCH_FORM_HTML}
+</body></html>"""
+
+
+def generate_fixtures(fixtures_folder: str = FIXTURES_FOLDER, pages: int = 3, jobs_per_page: int = 15,
+                      seed: int = 1) -> int:
+    """Write a synthetic set of saved pages using the markup the scraper relies on, return the job count."""
+    rng = random.Random(seed)
+    os.makedirs(fixtures_folder, exist_ok=True)
+    with open(os.path.join(fixtures_folder, "index.html"), mode='w', encoding='utf-8') as file:
+        file.write(INDEX_HTML)
+
+    count = 0
+    for page in range(pages):
+        jobs = []
+        for _ in range(jobs_per_page):
+            count += 1
+            skills = rng.sample(SKILLS, 4)
+            job = {
+                "job_id": f"{count:016x}",
+                "title": f"{skills[0]} Developer",
+                "company": rng.choice(COMPANIES),
+                "location": rng.choice(LOCATIONS),
+                "days_ago": rng.randint(1, 30),
+                "internal_apply": rng.random() < 0.5,
+                "description": [f"We are looking for a {skills[0]} developer to join our team.",
+                                f"Experience with {', '.join(skills[1:])} is required.",
+                                "Competitive salary, hybrid working and 25 days holiday."]
+            }
+            jobs.append(job)
+            with open(os.path.join(fixtures_folder, f"viewjob_{job['job_id']}.html"), mode='w',
+                      encoding='utf-8') as file:
+                file.write(job_page_html(job))
+        with open(os.path.join(fixtures_folder, f"search_{page}.html"), mode='w', encoding='utf-8') as file:
+            file.write(search_page_html(page, jobs, has_next=page < pages - 1))
+    with open(os.path.join(fixtures_folder, "fixtures.json"), mode='w', encoding='utf-8') as file:
+        json.dump({"pages": pages, "jobs_per_page": jobs_per_page, "jobs": count}, file)
+    print(f"Generated {count} jobs on {pages} pages in {fixtures_folder}")
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve saved Indeed pages for offline testing")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--folder", default=FIXTURES_FOLDER)
+    parser.add_argument("--generate", action="store_true", help="write synthetic pages into the folder first")
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--jobs-per-page", type=int, default=15)
+    parser.add_argument("--openai-latency", type=float, default=0.0, help="seconds the stub OpenAI endpoint waits")
+    args = parser.parse_args()
+
+    if args.generate:
+        generate_fixtures(args.folder, args.pages, args.jobs_per_page)
+    fixture_server = start_fixture_server(args.port, args.folder, openai_latency=args.openai_latency)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        fixture_server.shutdown()
@@ -14,6 +14,13 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 import shutil
 import config
+from response_cache import get_response_cache, cache_key
+from answer_memory import get_answer_memory
+from question_bank import get_question_bank
+from llm_client import get_llm_client
+from token_usage import get_token_usage, estimate_tokens
+import tracing
+from tracing import traced
 
 # # Set up Chrome options to connect to the existing session
 # chrome_options = Options()
@@ -26,19 +33,25 @@ import config
 
 OPENAI_API_KEY = config.api_key
 
+# Application status of a form filled up to the review page with final_apply_button turned off
+NOT_SUBMITTED = "Filled, not submitted"
 
 
 
 
+
+@traced()
 def apply_for_job(browser, internal_apply_button, resume_file_name):
+    steps = tracing.Stages("apply")
     try:
+        steps.next("step_1_3_open_window")
         # Step 1: Store the original window handle and list of handles before clicking the button
         original_window = browser.current_window_handle  # Store the current window handle
         original_windows = browser.window_handles  # Store the list of current window handles
 
         # Step 2: Click the internal apply button to open the new window
         ActionChains(browser).move_to_element(internal_apply_button).click().perform()
-        time.sleep(random.uniform(0.5, 1.5))  # Sleep to allow for the window to open
+        tracing.sleep(random.uniform(0.5, 1.5))  # Sleep to allow for the window to open
         print("Internal apply link clicked")
 
         # Step 3: Wait for the new window to appear and switch to it
@@ -49,7 +62,8 @@ def apply_for_job(browser, internal_apply_button, resume_file_name):
         print("Switched to the new window")
 
 
-        time.sleep(random.uniform(4.0, 5.0))
+        tracing.sleep(random.uniform(4.0, 5.0))
+        steps.next("step_3_5_reach_resume_page")
         # Step 3.5: Check if the URL has 'resume' in it
         current_url = browser.current_url
         previous_url = current_url
@@ -74,7 +88,7 @@ def apply_for_job(browser, internal_apply_button, resume_file_name):
                                 "arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", button)
                             ActionChains(browser).move_to_element(button).click().perform()
                             print("Continue button clicked.")
-                            time.sleep(random.uniform(2.0, 3.0))
+                            tracing.sleep(random.uniform(2.0, 3.0))
 
                             # Check if the URL has changed
                             current_url = browser.current_url
@@ -98,7 +112,7 @@ def apply_for_job(browser, internal_apply_button, resume_file_name):
                     else:
                         # No buttons could be clicked
                         print("No clickable 'Continue' buttons were successfully clicked. Waiting before retrying.")
-                        time.sleep(random.uniform(2.0, 3.0))
+                        tracing.sleep(random.uniform(2.0, 3.0))
                 else:
                     # No 'Continue' buttons found on the page
                     print("No 'Continue' buttons found on the page.")
@@ -115,72 +129,79 @@ def apply_for_job(browser, internal_apply_button, resume_file_name):
         gpt_answer = None
         application_status = "Failed"
 
+        steps.next("step_4_page_load")
         # Step 4: Wait until the specific element on the new page has loaded
         try:
             WebDriverWait(browser, 10).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, "label[for$='-file-resume-input']"))
             )
             print("Page loaded")
-            time.sleep(5)
+            tracing.sleep(5)
         except Exception as e:
             print(f"Element not found in Step 4: {e}")
             # Continue to next step
 
+        steps.next("step_5_upload_option")
         # Step 5: Select the radio button to upload the resume file
         try:
             label_for_radio = browser.find_element(By.CSS_SELECTOR, "label[for$='-file-resume-input']")
             ActionChains(browser).move_to_element(label_for_radio).click().perform()
-            time.sleep(random.uniform(2.0, 3.0))  # Wait for the next page to load
+            tracing.sleep(random.uniform(2.0, 3.0))  # Wait for the next page to load
             print("Radio button selected successfully!")
         except Exception as e:
             print(f"Element not found in Step 5: {e}")
             # Continue to next step
 
+        steps.next("step_6_cv_options")
         # Step 6: Click the "CV options" button
         try:
             cv_options_button = browser.find_element(By.ID, 'menu-button--menu--1')
             ActionChains(browser).move_to_element(cv_options_button).click().perform()
-            time.sleep(random.uniform(1.0, 2.0))
+            tracing.sleep(random.uniform(1.0, 2.0))
             print("CV options button clicked successfully!")
         except Exception as e:
             print(f"Element not found in Step 6: {e}")
             # Continue to next step
 
+        steps.next("step_7_upload")
         # Step 7: Upload the resume file
         try:
             file_path = os.path.abspath(resume_file_name)  # Get the absolute path of the file
             file_input = browser.find_element(By.CSS_SELECTOR, "input[type='file']")
             file_input.send_keys(file_path)
             print(f"File {file_path} uploaded successfully!")
-            time.sleep(random.uniform(3.0, 4.0))  # Wait for the next page to load
+            tracing.sleep(random.uniform(3.0, 4.0))  # Wait for the next page to load
         except Exception as e:
             print(f"Element not found in Step 7: {e}")
             # Continue to next step
 
+        steps.next("step_8_privacy")
         # Step 8: Select the second radio button
         try:
             label_for_radio = browser.find_element(By.CSS_SELECTOR, "label[for$='-resume-private-input']")
             ActionChains(browser).move_to_element(label_for_radio).click().perform()
-            time.sleep(random.uniform(2.0, 4.0))
+            tracing.sleep(random.uniform(2.0, 4.0))
             print("Second radio button selected successfully!")
         except Exception as e:
             print(f"Element not found in Step 8: {e}")
             # Continue to next step
 
+        steps.next("step_9_save")
         # Step 9: Click the "Save" button
         try:
             save_button = WebDriverWait(browser, 10).until(
                 EC.element_to_be_clickable((By.XPATH, "//button[@data-testid='ResumePrivacyModal-SaveBtn']"))
             )
             browser.execute_script("arguments[0].scrollIntoView(true);", save_button)
-            time.sleep(1)  # Optional wait for stability
+            tracing.sleep(1)  # Optional wait for stability
             ActionChains(browser).move_to_element(save_button).click().perform()
-            time.sleep(random.uniform(3.0, 4.0))
+            tracing.sleep(random.uniform(3.0, 4.0))
             print("Save button clicked successfully!")
         except Exception as e:
             print(f"Element not found in Step 9: {e}")
             # Continue to next step
 
+        steps.next("step_10_forms")
         # Step 10: Process forms (assuming process_forms is defined elsewhere)
         try:
             gpt_answer, application_status = process_forms(browser)
@@ -188,12 +209,13 @@ def apply_for_job(browser, internal_apply_button, resume_file_name):
             print(f"Error during form processing in Step 10: {e}")
             # application_status remains "Failed"
 
+        steps.next("step_11_close")
         # Step 11: Close the new tab and switch back to the original window
         try:
             browser.switch_to.window(new_window)
             browser.close()
             browser.switch_to.window(original_window)
-            time.sleep(random.uniform(0.5, 1.5))
+            tracing.sleep(random.uniform(0.5, 1.5))
             print("Application process completed.")
         except Exception as e:
             print(f"Error during window switching in Step 11: {e}")
@@ -204,12 +226,14 @@ def apply_for_job(browser, internal_apply_button, resume_file_name):
     except Exception as e:
         print(f"An error occurred: {e}")
         return None, "Failed"
+    finally:
+        steps.close()
 
 
 
 
 def human_like_delay(min_delay=0.5, max_delay=2.0):
-    time.sleep(random.uniform(min_delay, max_delay))
+    tracing.sleep(random.uniform(min_delay, max_delay))
 
 def human_like_typing(element, text):
     for char in text:
@@ -256,7 +280,111 @@ def extract_headings(driver):
     return headings
 
 
+# Collects headings, fields, labels and radio/checkbox options of the page in a single WebDriver call.
+# Mirrors extract_headings and detect_form_fields_webdriver, including the label lookup order of find_common_label.
+FORM_EXTRACTION_SCRIPT = """
+const text = (el) => el ? (el.innerText || '').trim() : '';
+const headings = [];
+const mainHeading = text(document.querySelector('.ia-BasePage-heading'));
+if (mainHeading) headings.push(mainHeading);
+document.querySelectorAll('.ia-Questions-item').forEach((item) => {
+    if (item.querySelector('input, textarea, select')) return;
+    const groupHeading = text(item.querySelector('label .css-gnfkuw'));
+    if (groupHeading) headings.push(groupHeading);
+});
+
+const findCommonLabel = (el) => {
+    const fieldset = el.closest('fieldset');
+    if (fieldset) {
+        const labelledBy = fieldset.getAttribute('aria-labelledby');
+        if (labelledBy && document.getElementById(labelledBy)) return text(document.getElementById(labelledBy));
+        const legend = fieldset.querySelector('legend');
+        if (legend) return text(legend);
+    }
+    const item = el.closest('div[class*="ia-Questions-item"]');
+    if (item) {
+        const legend = item.querySelector('legend');
+        if (legend) return text(legend);
+        const label = item.querySelector('label');
+        if (label) return text(label);
+    }
+    return null;
+};
+
+const optionLabel = (el) => {
+    let sibling = el.nextElementSibling;
+    while (sibling && sibling.tagName !== 'SPAN') sibling = sibling.nextElementSibling;
+    return text(sibling);
+};
+
+const elements = [...document.getElementsByTagName('input'), ...document.getElementsByTagName('textarea'),
+                  ...document.getElementsByTagName('select')];
+const fields = elements.map((el) => ({
+    id: el.id || el.getAttribute('name'),
+    name: el.getAttribute('name'),
+    type: el.type,
+    label: findCommonLabel(el),
+    choices: el.tagName === 'SELECT' ? [...el.options].map((o) => (o.text || '').trim()).filter(Boolean) : null,
+    option_label: (el.type === 'radio' || el.type === 'checkbox') ? optionLabel(el) : null
+}));
+return JSON.stringify({headings: headings, fields: fields});
+"""
+
+
+def detect_form_fields_script(driver):
+    """Detect the form fields with one execute_script call, same output as detect_form_fields_webdriver."""
+    page = json.loads(driver.execute_script(FORM_EXTRACTION_SCRIPT))
+
+    form_fields = []
+    radio_groups = {}  # To hold the grouped radio buttons
+    for element in page["fields"]:
+        if element["type"] == "radio" or element["type"] == "checkbox":
+            radio_group = element["name"]
+            if radio_group not in radio_groups:
+                radio_groups[radio_group] = {
+                    "group_label": element["label"],
+                    "options": []
+                }
+            radio_groups[radio_group]["options"].append({
+                "id": element["id"],
+                "label": element["option_label"]
+            })
+        elif element["label"]:
+            form_fields.append({
+                "id": element["id"],
+                "label": element["label"],
+                "type": element["type"]
+            })
+            if element["choices"]:
+                form_fields[-1]["choices"] = element["choices"]
+
+    for group_name, group_data in radio_groups.items():
+        form_fields.append({
+            "group": group_name,
+            "label": group_data["group_label"],
+            "type": "radio",
+            "options": group_data["options"]
+        })
+
+    if page["headings"]:
+        form_fields.insert(0, {"headings": page["headings"]})
+
+    print(f"Detected form fields with headings: {form_fields}")
+    return form_fields
+
+
+@traced()
 def detect_form_fields(driver):
+    """Detect the form fields of the current page, in one script call unless form_extraction_mode is "webdriver"."""
+    if config.form_extraction_mode.lower() == "script":
+        try:
+            return detect_form_fields_script(driver)
+        except Exception as e:
+            print(f"Script form extraction failed, falling back to WebDriver lookups: {e}")
+    return detect_form_fields_webdriver(driver)
+
+
+def detect_form_fields_webdriver(driver):
     # Extract the headings first
     headings = extract_headings(driver)
 
@@ -360,13 +488,28 @@ def detect_form_fields(driver):
     return form_fields
 
 
-def send_to_openai(profile_description, form_fields):
-    try:
-        headers = {
-            'Content-Type': 'application/json',
-            'Authorization': f'Bearer {OPENAI_API_KEY}'
-        }
+# Instructions and profile form a fixed prefix, only the form fields in the user message change between pages
+FORM_SYSTEM_PROMPT = """You are a helpful assistant that fills in form fields based on a profile.
+                    The user message lists form fields with labels and IDs.
+                    Fill the appropriate values for each field based on the provided profile description. 
+                    - If its a text field or text area, output the answer normally as text.
+                    - For checkboxes, provide "checked" or "unchecked" depending on whether it should be selected.
+                    - For dropdowns, if the exact value is not available, select the most similar option.
+                    - If no value is available do not output the id.
+                    - If it is a radio button, select and output only one answer which is most suitable from the radio group answers so that it could be selected.
+                    - Do not give no for any answer that except if it is stated above to answer No, if it's a yes or no question, regardless of the question, answer yes. Do not leave empty.
+                    Skip answering optional questions.
+                    Output only the id:value pair in a structured format, one per line.
+
+                    Profile: {profile}
+                    """
+
+FORM_PROMPT = """Here are the form fields with labels and IDs: {fields}."""
 
+
+@traced()
+def send_to_openai(profile_description, form_fields, use_cache=True):
+    try:
         # Modify the content to handle radio button groups, checkboxes, and dropdowns
         field_descriptions = []
         for field in form_fields:
@@ -381,7 +524,8 @@ def send_to_openai(profile_description, form_fields):
                 field_descriptions.append(f"Checkbox '{field['label']}' (ID: {field['id']})")
             elif field["type"] == "select-one":
                 # Describe dropdowns
-                field_descriptions.append(f"Dropdown '{field['label']}' (ID: {field['id']})")
+                choices = f" with options: {', '.join(field['choices'])}" if field.get("choices") else ""
+                field_descriptions.append(f"Dropdown '{field['label']}' (ID: {field['id']}){choices}")
             else:
                 # For other fields, describe them normally
                 field_descriptions.append(f"'{field['label']}' (ID: {field['id']})")
@@ -392,42 +536,91 @@ def send_to_openai(profile_description, form_fields):
             "model": "gpt-4o-mini",  # Replace with the model you have access to
             "messages": [
                 {"role": "system",
-                 "content": "You are a helpful assistant that fills in form fields based on a profile."},
+                 "content": FORM_SYSTEM_PROMPT.format(profile=profile_description)},
                 {
                     "role": "user",
-                    "content": f"""
-                    Given the following profile: {profile_description}
-                    Here are the form fields with labels and IDs: {fields_text}.
-                    Fill the appropriate values for each field based on the provided profile description. 
-                    - If its a text field or text area, output the answer normally as text.
-                    - For checkboxes, provide "checked" or "unchecked" depending on whether it should be selected.
-                    - For dropdowns, if the exact value is not available, select the most similar option.
-                    - If no value is available do not output the id.
-                    - If it is a radio button, select and output only one answer which is most suitable from the radio group answers so that it could be selected.
-                    - Do not give no for any answer that except if it is stated above to answer No, if it's a yes or no question, regardless of the question, answer yes. Do not leave empty.
-                    Skip answering optional questions.
-                    Output only the id:value pair in a structured format, one per line.
-                    """
+                    "content": FORM_PROMPT.format(fields=fields_text)
                 }
             ],
             "max_tokens": 1200,
             "temperature": 1.0
         }
         print(data)
-        response = requests.post('https://api.openai.com/v1/chat/completions', headers=headers, data=json.dumps(data))
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        message = response.json()['choices'][0]['message']['content'].strip()
+
+        # The same question page seen again on a later application is answered from the cache. A retry after a
+        # rejected page skips the lookup, the cached answer is the one that was rejected, and replaces it.
+        cache = get_response_cache()
+        key = cache_key(data["model"], FORM_SYSTEM_PROMPT, FORM_PROMPT, profile_description, fields_text)
+        if cache is not None and use_cache:
+            cached_message = cache.get(key)
+            if cached_message is not None:
+                print("Form answers found in the response cache")
+                get_token_usage().record_cache_hit("form", estimate_tokens(
+                    data["messages"][0]["content"] + data["messages"][1]["content"]))
+                return cached_message
+
+        answer = get_llm_client().chat(data)
+        get_token_usage().record("form", answer.get("usage"))
+        message = answer['choices'][0]['message']['content'].strip()
         print(message)
+        if cache is not None:
+            cache.put(key, message)
         return message
 
     except requests.exceptions.RequestException as e:
         print(f"Error in OpenAI API call: {e}")
         return None
 
-def autofill_fields(driver, form_fields, response_data):
+def answer_form_fields(profile_description, form_fields, use_memory=True):
+    """Answer the form fields from the profile questions and the answer memory, and send only the unknown
+    questions to OpenAI. use_memory=False sends every question to OpenAI, without the response cache.
+
+    Returns (answers, learned). The answers are in the same "id: value" line format as send_to_openai, or
+    None if there are none. learned is (fields, question answer pairs) of the OpenAI answers, to be passed to
+    remember_accepted_answers once the page is accepted, or None.
+    """
+    known, unknown_fields = {}, form_fields
+    bank = get_question_bank() if use_memory else None
+    if bank is not None:
+        known, unknown_fields = bank.answer(unknown_fields)
+        if known:
+            print(f"Answered {len(known)} fields from the profile questions")
+    memory = get_answer_memory() if use_memory else None
+    if memory is not None:
+        remembered, unknown_fields = memory.recall(unknown_fields)
+        if remembered:
+            print(f"Answered {len(remembered)} fields from the answer memory")
+        known.update(remembered)
+
+    response_lines = [f"{field_id}: {value}" for field_id, value in known.items()]
+    learned = None
+    if any("headings" not in field for field in unknown_fields):
+        response_data = send_to_openai(profile_description, unknown_fields, use_cache=use_memory)
+        if response_data:
+            response_lines.append(response_data)
+            learned = (unknown_fields, extract_question_answer_pairs(unknown_fields, response_data))
+    else:
+        print("All questions on this page were answered locally, skipping OpenAI")
+
+    return ("\n".join(response_lines) if response_lines else None), learned
+
+
+def remember_accepted_answers(pending, current_url):
+    """Remember the OpenAI answers of a question page once the browser has left it, None is the new pending value.
+
+    pending is (question page URL, fields, question answer pairs) or None.
+    """
+    if pending is None or current_url == pending[0]:
+        return pending
+    memory = get_answer_memory()
+    if memory is not None:
+        memory.remember(pending[1], pending[2])
+    return None
+
+
+def parse_autofill_response(response_data):
+    """Map the "field ID: value" lines of an OpenAI answer to a dictionary."""
     structured_response = {}
-
-    # Parse the response and map it to field IDs
     for entry in response_data.split("\n"):
         try:
             if entry and ":" in entry:
@@ -436,7 +629,116 @@ def autofill_fields(driver, form_fields, response_data):
         except ValueError:
             print(f"Skipping malformed line in response: {entry}")
             continue  # Continue processing other lines even if one fails
+    return structured_response
+
+
+# Applies every answer of a page in a single WebDriver call. Values are set through the native setters and
+# followed by input/change events, otherwise React keeps its own state and submits the old values.
+# Radio buttons and checkboxes are clicked so their handlers run. Mirrors autofill_fields_webdriver.
+FORM_FILL_SCRIPT = """
+const setNativeValue = (el, value) => {
+    const prototype = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype
+        : el.tagName === 'SELECT' ? HTMLSelectElement.prototype : HTMLInputElement.prototype;
+    Object.getOwnPropertyDescriptor(prototype, 'value').set.call(el, value);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+};
+const normalize = (value) => (value || '').trim().toLowerCase();
+
+return JSON.stringify(arguments[0].map((action) => {
+    const el = document.getElementById(action.id);
+    if (!el) return {id: action.id, status: 'missing'};
+    if (action.kind === 'radio') {
+        if (el.checked) return {id: action.id, status: 'unchanged'};
+        el.click();
+        return {id: action.id, status: 'filled'};
+    }
+    if (action.kind === 'checkbox') {
+        const value = normalize(action.value);
+        if ((value !== 'checked' && value !== 'unchecked') || el.checked === (value === 'checked')) {
+            return {id: action.id, status: 'unchanged'};
+        }
+        el.click();
+        return {id: action.id, status: 'filled'};
+    }
+    if (action.kind === 'select') {
+        const options = [...el.options];
+        const option = options.find((o) => o.text === action.value)
+            || options.find((o) => normalize(o.text) === normalize(action.value));
+        if (!option) return {id: action.id, status: 'unmatched', options: options.map((o) => o.text)};
+        setNativeValue(el, option.value);
+        return {id: action.id, status: 'filled', value: option.text};
+    }
+    if ((el.value || '').trim()) return {id: action.id, status: 'skipped', value: el.value};
+    el.focus();
+    setNativeValue(el, action.value);
+    el.blur();
+    return {id: action.id, status: 'filled'};
+}));
+"""
+
+
+def autofill_actions(form_fields, structured_response):
+    """The fill action of every field answered in structured_response, in page order."""
+    actions = []
+    for field in form_fields:
+        if 'id' in field:
+            if field['id'] not in structured_response:
+                continue
+            kind = {'radio': 'radio', 'checkbox': 'checkbox', 'select-one': 'select'}.get(field['type'], 'text')
+            actions.append({"id": field['id'], "kind": kind, "value": structured_response[field['id']]})
+        elif 'group' in field and 'options' in field:
+            for option in field['options']:
+                if option['id'] in structured_response:
+                    actions.append({"id": option['id'], "kind": "radio", "value": structured_response[option['id']]})
+                    break  # Stop after finding the matching radio button
+    return actions
+
+
+def autofill_fields_script(driver, form_fields, structured_response):
+    """Fill the fields with one execute_script call, a second one picks the closest option of unmatched dropdowns."""
+    actions = autofill_actions(form_fields, structured_response)
+    if not actions:
+        return
+    results = json.loads(driver.execute_script(FORM_FILL_SCRIPT, actions))
+
+    closest_actions = []
+    for action, result in zip(actions, results):
+        field_id, value = action["id"], action["value"]
+        if result["status"] == "missing":
+            print(f"Element with ID {field_id} not found on the page.")
+        elif result["status"] == "skipped":
+            print(f"Skipping field {field_id} because it already has a value: {result['value']}")
+        elif result["status"] == "unmatched":
+            # Find the most similar option if exact match isn't available
+            closest_match = get_close_matches(value, result["options"], n=1)
+            if closest_match:
+                closest_actions.append(dict(action, value=closest_match[0]))
+            else:
+                print(f"No similar option found for {value} in dropdown {field_id}")
+        elif result["status"] == "filled":
+            print(f"Filled field {field_id} with value: {result.get('value', value)}")
+
+    if closest_actions:
+        for result in json.loads(driver.execute_script(FORM_FILL_SCRIPT, closest_actions)):
+            if result["status"] == "filled":
+                print(f"Selected closest dropdown option {result['value']} for {result['id']}")
+
 
+@traced()
+def autofill_fields(driver, form_fields, response_data):
+    """Fill the fields of the page with the answers, in one script call unless form_fill_mode is "human"."""
+    structured_response = parse_autofill_response(response_data)
+    if config.form_fill_mode.lower() == "script":
+        try:
+            return autofill_fields_script(driver, form_fields, structured_response)
+        except Exception as e:
+            print(f"Script form filling failed, falling back to human-like typing: {e}")
+    return autofill_fields_webdriver(driver, form_fields, structured_response)
+
+
+def autofill_fields_webdriver(driver, form_fields, structured_response):
+    """Fill the fields one by one with scrolling, clicks and human-like typing."""
     # Fill fields with values from the response
     for field in form_fields:
         if 'id' in field:
@@ -556,6 +858,7 @@ def extract_question_answer_pairs(form_fields, response_data):
 
     return answers
 
+@traced()
 def process_forms(driver):
     form_fields_storage = []
     forward_steps = 0
@@ -566,11 +869,13 @@ def process_forms(driver):
     max_continue_attempts = 5  # Max attempts to press 'Continue' before marking as failed
     retry_attempts = 0  # To count the attempts to click the 'Continue' button
     openai_retry_done = False  # Flag to track if OpenAI retry was done once
+    pending_answers = None  # OpenAI answers of the last question page, remembered once the page is accepted
 
     while True:
         try:
             current_url = driver.current_url
             print(f"Current URL: {current_url}")
+            pending_answers = remember_accepted_answers(pending_answers, current_url)
 
             # Check if we've reached the retry limit
             if retry_attempts >= max_continue_attempts:
@@ -586,7 +891,8 @@ def process_forms(driver):
 
                 # Send form fields to OpenAI for autofill
                 profile_description = config.profile_answer_questions
-                response_data = send_to_openai(profile_description, form_fields)
+                response_data, learned = answer_form_fields(profile_description, form_fields)
+                pending_answers = (current_url, *learned) if learned else None
 
                 if not response_data:
                     print("No response from OpenAI. Skipping autofill.")
@@ -621,12 +927,13 @@ def process_forms(driver):
                         ActionChains(driver).move_to_element(button).click().perform()
                         print(f"Continue button clicked! (Step {forward_steps})")
                         forward_steps += 1
-                        time.sleep(random.uniform(2.0, 3.0))  # Short wait after clicking
+                        tracing.sleep(random.uniform(2.0, 3.0))  # Short wait after clicking
 
                         # Check if the URL has changed after clicking
                         current_url = driver.current_url
                         if current_url != previous_url:
                             print("URL has changed! Continue button clicked successfully.")
+                            pending_answers = remember_accepted_answers(pending_answers, current_url)
                             continue_clicked = True
                             retry_attempts = 0  # Reset retry attempts since click was successful
                             break
@@ -636,7 +943,10 @@ def process_forms(driver):
                                 print("URL has not changed. Retrying OpenAI once.")
                                 openai_retry_done = True  # Only retry once
                                 form_fields = detect_form_fields(driver)
-                                response_data = send_to_openai(profile_description, form_fields)
+                                # A remembered answer may have been rejected, ask OpenAI for the whole page
+                                response_data, learned = answer_form_fields(profile_description, form_fields,
+                                                                            use_memory=False)
+                                pending_answers = (current_url, *learned) if learned else None
                                 if response_data:
                                     autofill_fields(driver, form_fields, response_data)
                                     extracted_pairs = extract_question_answer_pairs(form_fields, response_data)
@@ -648,7 +958,7 @@ def process_forms(driver):
                                 break
                             else:
                                 print("URL has not changed, waiting 7 seconds before retrying.")
-                                time.sleep(7)  # Wait for 7 seconds before retrying
+                                tracing.sleep(7)  # Wait for 7 seconds before retrying
                                 retry_attempts += 1
                     except Exception as e:
                         print(f"Error pressing 'Continue' button, trying the next one")
@@ -676,7 +986,7 @@ def process_forms(driver):
                             smooth_scroll_to_element(driver, button)
                             ActionChains(driver).move_to_element(button).click().perform()
                             print("Continue applying or Review your application button clicked!")
-                            time.sleep(random.uniform(2.0, 3.0))  # Short wait after clicking
+                            tracing.sleep(random.uniform(2.0, 3.0))  # Short wait after clicking
 
                             # Check if the URL has changed
                             current_url = driver.current_url
@@ -686,7 +996,7 @@ def process_forms(driver):
                                 break
                             else:
                                 print("URL has not changed after clicking the button, retrying.")
-                                time.sleep(7)
+                                tracing.sleep(7)
                                 retry_attempts += 1
                         except Exception as e:
                             print(f"Error pressing the button: {e}")
@@ -702,7 +1012,7 @@ def process_forms(driver):
                     return accumulated_question_answer_pairs, application_status
 
             # Wait after attempting to click a 'Continue' button, then recheck the page
-            time.sleep(1)
+            tracing.sleep(1)
 
             # If the new URL contains "question", process the form again, but ensure it hasn't been processed before
             if ("question" in current_url.lower() or "document" in current_url.lower())  and current_url not in processed_urls:
@@ -725,8 +1035,8 @@ def process_forms(driver):
                             smooth_scroll_to_element(driver, button)
                             ActionChains(driver).move_to_element(button).click().perform()
                             print("Submit button clicked!")
-                            time.sleep(random.uniform(2.0, 3.0))  # Short wait after clicking
-                            time.sleep(10)
+                            tracing.sleep(random.uniform(2.0, 3.0))  # Short wait after clicking
+                            tracing.sleep(10)
 
                             # Check if the URL has changed
                             current_url = driver.current_url
@@ -740,15 +1050,20 @@ def process_forms(driver):
                                 break
                             else:
                                 print("URL has not changed after clicking the button, retrying.")
-                                time.sleep(7)
+                                tracing.sleep(7)
                                 retry_attempts += 1
                         except Exception as e:
                             print(f"Error pressing the button: {e}")
                             retry_attempts += 1
 
                     continue  # Skip to next iteration after clicking 'Continue applying' or 'Review your application'
+                elif config.final_apply_button.lower() != "yes":
+                    # Submission is turned off, the filled application is left on the review page
+                    print("Submission turned off, the application is filled but not submitted.")
+                    application_status = NOT_SUBMITTED
+                    return accumulated_question_answer_pairs, application_status
                 else:
-                    "Submission turned off or No submit button"
+                    "No submit button"
 
 
         except NoSuchElementException:
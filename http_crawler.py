@@ -0,0 +1,307 @@
+import asyncio
+import json
+import re
+from html.parser import HTMLParser
+from urllib.parse import urlencode, urljoin, urlparse, parse_qs
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+
+# Elements without a closing tag
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+# Elements that start a new line in the text of a node, like innerText in the browser
+BLOCK_TAGS = {"p", "div", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6", "tr", "section", "br"}
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/129.0.0.0 Safari/537.36",
+    "Accept-Language": "en-GB,en;q=0.9"
+}
+
+
+class Node:
+    """Minimal element of the parsed page tree."""
+
+    def __init__(self, tag: str, attrs: dict, parent=None) -> None:
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children = []  # Nodes and text strings
+
+    def classes(self) -> set:
+        return set((self.attrs.get("class") or "").split())
+
+    def iter(self):
+        for child in self.children:
+            if isinstance(child, Node):
+                yield child
+                yield from child.iter()
+
+    def find_all(self, tag: str = None, classes=(), **attrs) -> list:
+        """Return the descendants matching the tag, all given classes and attribute values."""
+        matches = []
+        for node in self.iter():
+            if tag and node.tag != tag:
+                continue
+            if classes and not set(classes) <= node.classes():
+                continue
+            if any(node.attrs.get(name.replace("_", "-")) != value for name, value in attrs.items()):
+                continue
+            matches.append(node)
+        return matches
+
+    def find(self, tag: str = None, classes=(), **attrs):
+        matches = self.find_all(tag, classes, **attrs)
+        return matches[0] if matches else None
+
+    def text(self) -> str:
+        parts = []
+        self._collect_text(parts)
+        lines = [re.sub(r'[ \t\r\f\v]+', ' ', line).strip() for line in "".join(parts).split("\n")]
+        return "\n".join(line for line in lines if line)
+
+    def _collect_text(self, parts: list) -> None:
+        if self.tag in ("script", "style"):
+            return
+        if self.tag in BLOCK_TAGS:
+            parts.append("\n")
+        for child in self.children:
+            if isinstance(child, Node):
+                child._collect_text(parts)
+            else:
+                parts.append(child)
+        if self.tag in BLOCK_TAGS:
+            parts.append("\n")
+
+
+class TreeBuilder(HTMLParser):
+    """Builds a Node tree with the standard library parser, tolerating unclosed tags."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.root = Node("document", {})
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {name: value or "" for name, value in attrs}, self.stack[-1])
+        self.stack[-1].children.append(node)
+        if tag not in VOID_TAGS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        node = Node(tag, {name: value or "" for name, value in attrs}, self.stack[-1])
+        self.stack[-1].children.append(node)
+
+    def handle_endtag(self, tag):
+        # Close up to the matching open tag, stray closing tags are ignored
+        for index in range(len(self.stack) - 1, 0, -1):
+            if self.stack[index].tag == tag:
+                del self.stack[index:]
+                return
+
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+
+# Link to the next results page, present on every page but the last
+NEXT_PAGE_MARKER = 'data-testid="pagination-page-next"'
+
+
+def search_page_url(base_url: str, keyword: str, page: int) -> str:
+    """Return the URL of results page <page> (0 based) of a keyword, sorted by date."""
+    return f"{base_url.rstrip('/')}/jobs?" + urlencode({"q": keyword, "sort": "date", "start": page * 10})
+
+
+def job_page_url(base_url: str, job_id: str) -> str:
+    return f"{base_url.rstrip('/')}/viewjob?jk={job_id}"
+
+
+def parse_html(html: str) -> Node:
+    builder = TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+def parse_search_page(html: str, page_url: str) -> list:
+    """Return the job cards of a search results page, in the format of IndeedAutoApplyBot.extract_listing_cards."""
+    cards = _parse_mosaic_cards(html, page_url)
+    if cards is not None:
+        return cards
+
+    cards = []
+    document = parse_html(html)
+    for job_list in document.find_all("ul", classes=("css-zu9cdh",)):
+        for item in job_list.find_all("li"):
+            heading = item.find("h2", classes=("jobTitle",))
+            title = heading.find("a") if heading else None
+            if title is None:
+                continue
+            url = urljoin(page_url, title.attrs.get("href", ""))
+            company = item.find("span", data_testid="company-name")
+            location = item.find("div", data_testid="text-location")
+            date = item.find("span", classes=("css-qvloho", "eu4oa1w0"))
+            cards.append({
+                "job_id": title.attrs.get("data-jk") or parse_qs(urlparse(url).query).get("jk", [None])[0],
+                "title": title.text(),
+                "url": url,
+                "company": company.text() if company else "",
+                "location": location.text() if location else "",
+                "date": date.text() if date else None
+            })
+    return cards
+
+
+def _parse_mosaic_cards(html: str, page_url: str):
+    """Read the job cards from the JSON Indeed embeds in search pages, None if it is not there."""
+    match = re.search(r'window\.mosaic\.providerData\["mosaic-provider-jobcards"\]\s*=\s*(\{.*?\});\s*\n', html)
+    if not match:
+        return None
+    try:
+        results = json.loads(match.group(1))["metaData"]["mosaicProviderJobCardsModel"]["results"]
+    except (json.JSONDecodeError, KeyError, TypeError):
+        return None
+    return [{
+        "job_id": result.get("jobkey"),
+        "title": result.get("displayTitle") or result.get("title", ""),
+        "url": urljoin(page_url, result.get("link") or f"/viewjob?jk={result.get('jobkey')}"),
+        "company": result.get("company", ""),
+        "location": result.get("formattedLocation", ""),
+        "date": result.get("formattedRelativeTime")
+    } for result in results if result.get("jobkey")]
+
+
+def parse_job_page(html: str, page_url: str) -> dict:
+    """Return the description and apply link of a viewjob page."""
+    document = parse_html(html)
+    description = document.find(id="jobDescriptionText")
+    internal_apply = document.find(id="indeedApplyButton") is not None
+
+    apply_link = "Apply link not found"
+    if internal_apply:
+        apply_link = page_url
+    else:
+        container = document.find(id="applyButtonLinkContainer")
+        external_button = container.find("button") if container else None
+        if external_button is not None:
+            apply_link = external_button.attrs.get("href") or "Apply link not available"
+
+    return {
+        "job_description": description.text() if description else "",
+        "internal_apply": "Yes" if internal_apply else "No",
+        "apply_link": apply_link
+    }
+
+
+class HttpCrawler:
+    """Crawls search and viewjob pages over a pooled HTTP session instead of clicking through Chrome.
+
+    is_known(job_id) tells the crawler which jobs to skip and handle_record(record) receives the
+    same job records as IndeedAutoApplyBot.scrape_results_page produces. parse_date turns the date
+    text of a job card into the posting date. is_earlier(job_id) tells which jobs were stored by an
+    earlier run, a run of known_jobs_stop of them ends the paging of a keyword.
+    """
+
+    def __init__(self, is_known, handle_record, parse_date, base_url: str = None, concurrency: int = None,
+                 is_earlier=None) -> None:
+        self.is_known = is_known
+        self.is_earlier = is_earlier
+        self.handle_record = handle_record
+        self.parse_date = parse_date
+        self.base_url = (base_url or config.indeed_base_url).rstrip("/")
+        self.concurrency = concurrency or config.http_concurrency
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(HEADERS)
+
+    def search_url(self, keyword: str, page: int) -> str:
+        return search_page_url(self.base_url, keyword, page)
+
+    def job_url(self, job_id: str) -> str:
+        return job_page_url(self.base_url, job_id)
+
+    def fetch(self, url: str) -> str:
+        response = self.session.get(url, timeout=15)
+        response.raise_for_status()
+        return response.text
+
+    async def _fetch(self, semaphore: asyncio.Semaphore, url: str):
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(self.fetch, url)
+            except requests.exceptions.RequestException as e:
+                print(f"Failed to fetch {url}: {e}")
+                return None
+
+    async def crawl_keyword(self, keyword: str, semaphore: asyncio.Semaphore) -> None:
+        search_urls = [self.search_url(keyword, page) for page in range(config.pagination_limit)]
+        if config.known_jobs_stop > 0 and self.is_earlier is not None:
+            # Fetched in order, paging stops at a run of known_jobs_stop already processed jobs
+            pages = []
+            streak = 0
+            for url in search_urls:
+                pages.append(await self._fetch(semaphore, url))
+                streak = self._known_streak(pages[-1], url, streak)
+                if streak >= config.known_jobs_stop:
+                    break
+        else:
+            pages = await asyncio.gather(*(self._fetch(semaphore, url) for url in search_urls))
+
+        cards = {}
+        for url, html in zip(search_urls, pages):
+            if html is None:
+                continue
+            for card in parse_search_page(html, url):
+                if card["job_id"] and card["job_id"] not in cards and not self.is_known(card["job_id"]):
+                    cards[card["job_id"]] = card
+        # Only counted when the last fetched page links to a next one
+        saved = len(search_urls) - len(pages) if pages and pages[-1] and NEXT_PAGE_MARKER in pages[-1] else 0
+        print(f"'{keyword}': {len(cards)} new jobs on {len(pages)} pages"
+              + (f", {saved} pages not fetched after jobs processed by earlier runs" if saved else ""))
+
+        job_ids = list(cards)
+        job_pages = await asyncio.gather(*(self._fetch(semaphore, self.job_url(job_id)) for job_id in job_ids))
+        for job_id, html in zip(job_ids, job_pages):
+            if html is None:
+                continue
+            card = cards[job_id]
+            details = parse_job_page(html, self.job_url(job_id))
+            self.handle_record({
+                "job_title": card["title"],
+                "company_name": card["company"],
+                "location": card["location"],
+                "job_description": details["job_description"],
+                "posting_date": self.parse_date(card["date"]),
+                "apply_link": details["apply_link"],
+                "job_listing_url": card["url"],
+                "job_id": job_id,
+                "internal_apply": details["internal_apply"]
+            })
+
+    def _known_streak(self, html, url: str, streak: int) -> int:
+        """Continue a count of consecutive jobs stored by earlier runs over the cards of a results page.
+
+        Jobs of this run found under another keyword neither count nor break the run.
+        """
+        for card in parse_search_page(html, url) if html is not None else []:
+            if not card["job_id"]:
+                continue
+            if self.is_earlier(card["job_id"]):
+                streak += 1
+                if streak >= config.known_jobs_stop:
+                    break
+            elif not self.is_known(card["job_id"]):
+                streak = 0
+        return streak
+
+    async def crawl_async(self, keywords: list) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        for keyword in keywords:
+            await self.crawl_keyword(keyword, semaphore)
+
+    def crawl(self, keywords: list) -> None:
+        asyncio.run(self.crawl_async(keywords))
@@ -0,0 +1,392 @@
+import csv
+import json
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+
+import config
+
+# Column order of the exported CSV files, matching the original master/latest CSV layout
+CSV_HEADERS = ["Job Title", "Company Name", "Location", "Job Description", "Posting Date", "Apply Link",
+               "Job Listing URL", "Job ID", "Date Recorded", "Internal apply", "Resume path", "AI answer",
+               "Suitability", "Application status"]
+
+# Maps the record keys used by the scraper to the CSV headers
+RECORD_KEYS = ["job_title", "company_name", "location", "job_description", "posting_date", "apply_link",
+               "job_listing_url", "job_id", "date_recorded", "internal_apply", "resume_path", "ai_answer",
+               "suitability", "application_status"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    job_title TEXT,
+    company_name TEXT,
+    location TEXT,
+    job_description TEXT,
+    posting_date TEXT,
+    apply_link TEXT,
+    job_listing_url TEXT,
+    date_recorded TEXT,
+    internal_apply TEXT,
+    resume_path TEXT,
+    run_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_run_id ON jobs (run_id);
+CREATE TABLE IF NOT EXISTS llm_results (
+    job_id TEXT PRIMARY KEY,
+    suitability TEXT,
+    response TEXT,
+    recorded_at TEXT
+);
+CREATE TABLE IF NOT EXISTS applications (
+    job_id TEXT PRIMARY KEY,
+    ai_answer TEXT,
+    status TEXT,
+    recorded_at TEXT
+);
+CREATE TABLE IF NOT EXISTS job_fingerprints (
+    job_id TEXT PRIMARY KEY,
+    fingerprint INTEGER NOT NULL,
+    band0 INTEGER NOT NULL,
+    band1 INTEGER NOT NULL,
+    band2 INTEGER NOT NULL,
+    band3 INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_fingerprints_band0 ON job_fingerprints (band0);
+CREATE INDEX IF NOT EXISTS idx_fingerprints_band1 ON job_fingerprints (band1);
+CREATE INDEX IF NOT EXISTS idx_fingerprints_band2 ON job_fingerprints (band2);
+CREATE INDEX IF NOT EXISTS idx_fingerprints_band3 ON job_fingerprints (band3);
+CREATE TABLE IF NOT EXISTS run_cursor (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    run_id INTEGER,
+    keywords TEXT,
+    keyword_index INTEGER,
+    page INTEGER,
+    application TEXT,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS pending_jobs (
+    job_id TEXT PRIMARY KEY,
+    record TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS application_queue (
+    job_id TEXT PRIMARY KEY,
+    record TEXT NOT NULL,
+    resume_path TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_application_queue_status ON application_queue (status, next_attempt_at);
+"""
+
+
+class JobStore:
+    """SQLite backed storage for scraped jobs, LLM results and applications."""
+
+    def __init__(self, db_path: str, batch_size: int = 20) -> None:
+        self.db_path = db_path
+        self.batch_size = max(1, batch_size)
+        self.pending_writes = 0
+        # The connection is shared between threads, every access goes through this lock
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+
+    def start_run(self) -> int:
+        """Register a new scraping run and return its id."""
+        with self.lock:
+            cursor = self.connection.execute("INSERT INTO runs (started_at) VALUES (?)",
+                                             (datetime.now().strftime('%Y-%m-%d %H:%M:%S'),))
+            self.connection.commit()
+            return cursor.lastrowid
+
+    def is_empty(self) -> bool:
+        with self.lock:
+            return self.connection.execute("SELECT 1 FROM jobs LIMIT 1").fetchone() is None
+
+    def is_processed(self, job_id: str) -> bool:
+        """Index lookup on the Job ID primary key."""
+        with self.lock:
+            row = self.connection.execute("SELECT 1 FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            return row is not None
+
+    def is_processed_before(self, job_id: str, run_id: int) -> bool:
+        """True when the job was stored by a run other than run_id, or imported from the master CSV."""
+        with self.lock:
+            row = self.connection.execute("SELECT 1 FROM jobs WHERE job_id = ? AND (run_id IS NULL OR run_id != ?)",
+                                          (job_id, run_id)).fetchone()
+            return row is not None
+
+    def add_job(self, record: dict, run_id: int = None, llm_response: dict = None) -> None:
+        """Store a processed job together with its LLM result and application status."""
+        recorded_at = record.get("date_recorded") or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self.lock:
+            self.connection.execute(
+                """INSERT OR REPLACE INTO jobs (job_id, job_title, company_name, location, job_description,
+                   posting_date, apply_link, job_listing_url, date_recorded, internal_apply, resume_path, run_id)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (record["job_id"], record.get("job_title"), record.get("company_name"), record.get("location"),
+                 record.get("job_description"), record.get("posting_date"), record.get("apply_link"),
+                 record.get("job_listing_url"), recorded_at, record.get("internal_apply"),
+                 record.get("resume_path"), run_id))
+            self.connection.execute(
+                "INSERT OR REPLACE INTO llm_results (job_id, suitability, response, recorded_at) VALUES (?, ?, ?, ?)",
+                (record["job_id"], record.get("suitability"),
+                 json.dumps(llm_response) if llm_response is not None else None, recorded_at))
+            self.save_application(record["job_id"], record.get("ai_answer"), record.get("application_status"),
+                                  recorded_at)
+            self._mark_write()
+
+    def save_application(self, job_id: str, ai_answer, status: str, recorded_at: str = None) -> None:
+        """Insert or update the application outcome of a job."""
+        if isinstance(ai_answer, dict):
+            ai_answer = json.dumps(ai_answer)
+        recorded_at = recorded_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO applications (job_id, ai_answer, status, recorded_at) VALUES (?, ?, ?, ?)",
+                (job_id, ai_answer, status, recorded_at))
+            self._mark_write()
+
+    def jobs_with_suitability(self, suitability: str) -> list:
+        """Return (job_id, job_title, job_description) of the jobs with the given suitability value."""
+        with self.lock:
+            return self.connection.execute(
+                """SELECT j.job_id, j.job_title, j.job_description FROM jobs j
+                   JOIN llm_results l ON l.job_id = j.job_id WHERE l.suitability = ?""",
+                (suitability,)).fetchall()
+
+    def update_llm_result(self, job_id: str, suitability: str, llm_response: dict, resume_path: str = None,
+                          application_status: str = None) -> None:
+        """Replace the LLM result of an already stored job, used when batch results arrive later."""
+        recorded_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO llm_results (job_id, suitability, response, recorded_at) VALUES (?, ?, ?, ?)",
+                (job_id, suitability, json.dumps(llm_response), recorded_at))
+            self.connection.execute("UPDATE jobs SET resume_path = ? WHERE job_id = ?", (resume_path, job_id))
+            self.connection.execute("UPDATE applications SET status = ?, recorded_at = ? WHERE job_id = ?",
+                                    (application_status, recorded_at, job_id))
+            self._mark_write()
+
+    def add_fingerprint(self, job_id: str, fingerprint: int, bands: list) -> None:
+        """Store the SimHash of a job description with its 4 bands, each band is indexed."""
+        # SQLite integers are signed 64 bit
+        signed = fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+        with self.lock:
+            self.connection.execute(
+                """INSERT OR REPLACE INTO job_fingerprints (job_id, fingerprint, band0, band1, band2, band3)
+                   VALUES (?, ?, ?, ?, ?, ?)""", (job_id, signed, *bands))
+            self._mark_write()
+
+    def fingerprint_candidates(self, bands: list) -> list:
+        """Return (job_id, fingerprint) of the jobs sharing at least one band with the given ones."""
+        with self.lock:
+            rows = self.connection.execute(
+                """SELECT job_id, fingerprint FROM job_fingerprints
+                   WHERE band0 = ? OR band1 = ? OR band2 = ? OR band3 = ?""", tuple(bands)).fetchall()
+        return [(job_id, fingerprint % (1 << 64)) for job_id, fingerprint in rows]
+
+    def llm_result(self, job_id: str):
+        """Return (suitability, llm response, resume path) of a stored job, None when it has no result."""
+        with self.lock:
+            row = self.connection.execute(
+                """SELECT l.suitability, l.response, j.resume_path FROM llm_results l
+                   JOIN jobs j ON j.job_id = l.job_id WHERE l.job_id = ?""", (job_id,)).fetchone()
+        if row is None:
+            return None
+        try:
+            response = json.loads(row[1]) if row[1] else {}
+        except json.JSONDecodeError:
+            response = {}
+        return row[0], response, row[2]
+
+    def save_cursor(self, run_id: int, keywords: list, keyword_index: int, page: int,
+                    application: dict = None) -> None:
+        """Save the position of the scrape loop, committed at once together with the pending writes."""
+        with self.lock:
+            self.connection.execute(
+                """INSERT OR REPLACE INTO run_cursor (id, run_id, keywords, keyword_index, page,
+                   application, updated_at) VALUES (1, ?, ?, ?, ?, ?, ?)""",
+                (run_id, json.dumps(keywords), keyword_index, page,
+                 json.dumps(application) if application is not None else None,
+                 datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+            self.flush()
+
+    def load_cursor(self):
+        """Return the saved position of an unfinished run as a dictionary, None after a finished run."""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT run_id, keywords, keyword_index, page, application FROM run_cursor WHERE id = 1"
+            ).fetchone()
+        if row is None:
+            return None
+        return {"run_id": row[0], "keywords": json.loads(row[1]), "keyword_index": row[2], "page": row[3],
+                "application": json.loads(row[4]) if row[4] else None}
+
+    def clear_cursor(self) -> None:
+        with self.lock:
+            self.connection.execute("DELETE FROM run_cursor")
+            self.flush()
+
+    def add_pending(self, record: dict) -> None:
+        """Remember a job handed to the scoring pipeline until its result is stored."""
+        with self.lock:
+            self.connection.execute("INSERT OR REPLACE INTO pending_jobs (job_id, record) VALUES (?, ?)",
+                                    (record["job_id"], json.dumps(record)))
+            self._mark_write()
+
+    def remove_pending(self, job_id: str) -> None:
+        with self.lock:
+            self.connection.execute("DELETE FROM pending_jobs WHERE job_id = ?", (job_id,))
+            self._mark_write()
+
+    def pending_jobs(self) -> list:
+        """Return the records of the jobs that were still waiting for scoring when a run stopped."""
+        with self.lock:
+            rows = self.connection.execute("SELECT record FROM pending_jobs").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def enqueue_application(self, record: dict, resume_path: str) -> None:
+        """Queue a job for the apply worker, committed at once. A job already in the queue is left as it is."""
+        with self.lock:
+            self.connection.execute(
+                """INSERT OR IGNORE INTO application_queue (job_id, record, resume_path, status, updated_at)
+                   VALUES (?, ?, ?, 'queued', ?)""",
+                (record["job_id"], json.dumps(record), resume_path, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+            self.flush()
+
+    def claim_application(self, now: float):
+        """Mark the next queued application that is due as applying and return it, None when none is due.
+
+        The returned record has the queue fields resume_path and attempts (counting this one) added.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                """SELECT job_id, record, resume_path, attempts FROM application_queue
+                   WHERE status = 'queued' AND next_attempt_at <= ? ORDER BY next_attempt_at, rowid LIMIT 1""",
+                (now,)).fetchone()
+            if row is None:
+                return None
+            self.connection.execute(
+                "UPDATE application_queue SET status = 'applying', attempts = ?, updated_at = ? WHERE job_id = ?",
+                (row[3] + 1, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), row[0]))
+            self.flush()
+        return dict(json.loads(row[1]), resume_path=row[2], attempts=row[3] + 1)
+
+    def update_application(self, job_id: str, status: str, next_attempt_at: float = 0, error: str = None) -> None:
+        """Set the queue status of an application, committed at once."""
+        with self.lock:
+            self.connection.execute(
+                """UPDATE application_queue SET status = ?, next_attempt_at = ?, last_error = ?, updated_at = ?
+                   WHERE job_id = ?""",
+                (status, next_attempt_at, error, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), job_id))
+            self.flush()
+
+    def interrupt_applications(self) -> list:
+        """Mark the applications left in progress by a stopped worker as interrupted and return their job IDs."""
+        with self.lock:
+            job_ids = [row[0] for row in self.connection.execute(
+                "SELECT job_id FROM application_queue WHERE status = 'applying'").fetchall()]
+            for job_id in job_ids:
+                self.update_application(job_id, "interrupted")
+        return job_ids
+
+    def application_queue_counts(self) -> dict:
+        with self.lock:
+            return dict(self.connection.execute(
+                "SELECT status, COUNT(*) FROM application_queue GROUP BY status").fetchall())
+
+    def set_resume_path(self, job_id: str, resume_path) -> None:
+        with self.lock:
+            self.connection.execute("UPDATE jobs SET resume_path = ? WHERE job_id = ?", (resume_path, job_id))
+            self._mark_write()
+
+    def _mark_write(self) -> None:
+        # Writes are grouped into one transaction and committed every batch_size rows
+        self.pending_writes += 1
+        if self.pending_writes >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        with self.lock:
+            self.connection.commit()
+            self.pending_writes = 0
+
+    def close(self) -> None:
+        with self.lock:
+            self.flush()
+            self.connection.close()
+
+    def iter_rows(self, run_id: int = None):
+        """Yield jobs in the CSV column order, optionally limited to one run."""
+        query = """SELECT j.job_title, j.company_name, j.location, j.job_description, j.posting_date, j.apply_link,
+                          j.job_listing_url, j.job_id, j.date_recorded, j.internal_apply, j.resume_path,
+                          a.ai_answer, l.suitability, a.status
+                   FROM jobs j
+                   LEFT JOIN llm_results l ON l.job_id = j.job_id
+                   LEFT JOIN applications a ON a.job_id = j.job_id"""
+        params = ()
+        if run_id is not None:
+            query += " WHERE j.run_id = ?"
+            params = (run_id,)
+        query += " ORDER BY j.date_recorded"
+        with self.lock:
+            rows = self.connection.execute(query, params).fetchall()
+        yield from rows
+
+    def export_csv(self, csv_path: str, run_id: int = None) -> int:
+        """Write the stored jobs to a CSV file with the original headers and return the row count."""
+        count = 0
+        with open(csv_path, mode='w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(CSV_HEADERS)
+            for row in self.iter_rows(run_id):
+                writer.writerow(row)
+                count += 1
+        print(f"Exported {count} jobs to {csv_path}")
+        return count
+
+    def import_csv(self, csv_path: str) -> int:
+        """One-off migration of an existing master CSV file into the store."""
+        count = 0
+        with open(csv_path, mode='r', newline='', encoding='utf-8') as file:
+            reader = csv.DictReader(file)
+            for row in reader:
+                if not row.get("Job ID"):
+                    continue
+                record = {key: row.get(header) or None for key, header in zip(RECORD_KEYS, CSV_HEADERS)}
+                self.add_job(record)
+                count += 1
+        self.flush()
+        print(f"Imported {count} jobs from {csv_path}")
+        return count
+
+    def last_run_id(self):
+        with self.lock:
+            row = self.connection.execute("SELECT MAX(run_id) FROM runs").fetchone()
+            return row[0] if row else None
+
+
+if __name__ == "__main__":
+    # Usage: python job_store.py [master|latest] [output.csv]
+    which = sys.argv[1] if len(sys.argv) > 1 else "master"
+    store = JobStore(config.job_store_db)
+    if which == "latest":
+        output = sys.argv[2] if len(sys.argv) > 2 else config.latest_csv
+        store.export_csv(output, run_id=store.last_run_id())
+    else:
+        output = sys.argv[2] if len(sys.argv) > 2 else config.master_csv
+        store.export_csv(output)
+    store.close()
@@ -0,0 +1,199 @@
+import json
+import random
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+from token_usage import estimate_tokens
+
+# Answers worth retrying, the others are returned to the caller as errors
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(text) -> float:
+    """Seconds of an OpenAI reset header such as "1s", "6m0s" or "20ms", 0 when missing."""
+    if not text:
+        return 0.0
+    return sum(float(number) * DURATION_UNITS[unit]
+               for number, unit in re.findall(r'(\d+(?:\.\d+)?)(ms|s|m|h)', text))
+
+
+def extract_json_from_text(text: str) -> str:
+    """Extract the first JSON object found in a string."""
+    # Decode from each opening brace instead of a greedy regex, text around or after the object is ignored
+    decoder = json.JSONDecoder()
+    start = text.find("{")
+    while start != -1:
+        try:
+            _, end = decoder.raw_decode(text, start)
+            return text[start:end]
+        except json.JSONDecodeError:
+            start = text.find("{", start + 1)
+    return None
+
+
+class TokenBucket:
+    """Rate limiter refilled continuously over a minute, like the OpenAI per minute limits.
+
+    The capacity starts at configured_limit (0 means no limit until one is learned) and follows the
+    x-ratelimit headers of the responses, which also correct the local count with the server's.
+    """
+
+    def __init__(self, configured_limit: int = 0) -> None:
+        self.capacity = float(configured_limit)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        if self.capacity:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def acquire(self, amount: float = 1) -> None:
+        """Take amount from the bucket, sleeping only as long as needed for it to refill."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if not self.capacity:
+                    return
+                # A request larger than the whole bucket only waits for a full bucket
+                amount = min(amount, self.capacity)
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) * 60 / self.capacity
+            time.sleep(wait)
+
+    def update(self, limit, remaining, reset: float) -> None:
+        """Apply the limit and remaining values of the rate limit headers."""
+        if limit is None or remaining is None:
+            return
+        with self.lock:
+            self._refill(time.monotonic())
+            # Without a limit the bucket was never filled, the first headers fill it
+            self.tokens = min(self.tokens, float(remaining)) if self.capacity else float(remaining)
+            self.capacity = float(limit)
+            if float(remaining) <= 0 and reset:
+                # Empty until the server says the window resets
+                self.tokens = -reset * self.capacity / 60
+
+
+def _header_number(headers, name: str):
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class LLMClient:
+    """OpenAI chat completions client shared by the suitability and form filling calls.
+
+    One keep-alive session with a connection pool sized for the scoring workers, token buckets for
+    requests and tokens per minute driven by the rate limit headers, and retries with jittered
+    exponential backoff on 429, 5xx and connection errors.
+    """
+
+    def __init__(self, base_url: str = None, api_key: str = None) -> None:
+        self.base_url = (base_url or config.openai_base_url).rstrip("/")
+        self.api_key = api_key if api_key is not None else config.api_key
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(4, config.llm_workers + 2))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.requests_bucket = TokenBucket(config.openai_requests_per_minute)
+        self.tokens_bucket = TokenBucket(config.openai_tokens_per_minute)
+
+    def _update_limits(self, headers) -> None:
+        self.requests_bucket.update(_header_number(headers, "x-ratelimit-limit-requests"),
+                                    _header_number(headers, "x-ratelimit-remaining-requests"),
+                                    parse_duration(headers.get("x-ratelimit-reset-requests")))
+        self.tokens_bucket.update(_header_number(headers, "x-ratelimit-limit-tokens"),
+                                  _header_number(headers, "x-ratelimit-remaining-tokens"),
+                                  parse_duration(headers.get("x-ratelimit-reset-tokens")))
+
+    def _backoff(self, attempt: int, response=None) -> float:
+        if response is not None:
+            retry_after = _header_number(response.headers, "retry-after")
+            if retry_after is not None:
+                return retry_after
+            reset = max(parse_duration(response.headers.get("x-ratelimit-reset-requests")),
+                        parse_duration(response.headers.get("x-ratelimit-reset-tokens")))
+            if response.status_code == 429 and reset:
+                return reset * random.uniform(1.0, 1.2)
+        return min(30.0, 2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def post(self, path: str, data: dict, timeout: float = None, stream: bool = False) -> requests.Response:
+        """POST to the API with rate limiting and retries, raises a RequestException when it keeps failing."""
+        headers = {
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {self.api_key}'
+        }
+        body = json.dumps(data)
+        expected_tokens = estimate_tokens(body) + data.get("max_tokens", 0)
+        timeout = timeout or config.openai_timeout
+
+        for attempt in range(config.openai_max_retries + 1):
+            self.requests_bucket.acquire(1)
+            self.tokens_bucket.acquire(expected_tokens)
+            try:
+                response = self.session.post(f"{self.base_url}{path}", headers=headers, data=body, timeout=timeout,
+                                             stream=stream)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == config.openai_max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+
+            self._update_limits(response.headers)
+            if response.status_code in RETRY_STATUS and attempt < config.openai_max_retries:
+                wait = self._backoff(attempt, response)
+                print(f"OpenAI answered {response.status_code}, retrying in {wait:.1f} s")
+                response.close()
+                time.sleep(wait)
+                continue
+            response.raise_for_status()  # Raise an exception for HTTP errors
+            return response
+
+    def chat(self, data: dict, timeout: float = None) -> dict:
+        """Send a chat completion request and return the decoded answer."""
+        return self.post("/chat/completions", data, timeout).json()
+
+    def stream_chat(self, data: dict, timeout: float = None):
+        """Send a streamed chat completion request and yield its chunks as they arrive.
+
+        Closing the generator early (break) closes the connection, which stops the generation of the
+        rest of the answer.
+        """
+        response = self.post("/chat/completions", dict(data, stream=True), timeout, stream=True)
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                payload = line[len("data:"):].strip()
+                if payload == "[DONE]":
+                    return
+                yield json.loads(payload)
+        finally:
+            response.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """Return the shared client, created again if the base URL or key in config.py changed."""
+    global _client
+    with _client_lock:
+        if _client is None or _client.base_url != config.openai_base_url.rstrip("/") \
+                or _client.api_key != config.api_key:
+            _client = LLMClient()
+        return _client
@@ -1,165 +1,231 @@
 import requests
 import json
-import csv
 from selenium import webdriver
-import time
-import random
 from selenium.webdriver.common.action_chains import ActionChains
 import os
 from urllib.parse import urlparse, parse_qs
 from datetime import datetime, timedelta
-from docx import Document
 import re
-import shutil
+import threading
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException, ElementClickInterceptedException, \
-    MoveTargetOutOfBoundsException, TimeoutException
-from docx.shared import Pt
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+    MoveTargetOutOfBoundsException, TimeoutException, StaleElementReferenceException
 from form_processor import apply_for_job  # Import the function
 from form_processor import move_html
+from job_store import JobStore
+from scoring_pipeline import ScoringPipeline
+from response_cache import get_response_cache, cache_key
+from batch_scoring import ask_chatgpt_batch, PENDING_SUITABILITY
+from http_crawler import HttpCrawler, search_page_url
+from checkpoint import RunCheckpoint
+from prefilter import prefilter_jobs
+from llm_client import get_llm_client, extract_json_from_text
+from token_usage import get_token_usage, estimate_tokens, trim_to_tokens
+from near_duplicates import find_near_duplicate, remember_fingerprint
+from resume_renderer import get_resume_template, ResumeRenderService
+from browser_pool import BrowserPool
+from apply_queue import ApplyWorker, is_deferred
+import fast_browser
+import pacing
+from tracing import span, traced
 import config
 
 template_path = config.template_path
 
 
-def extract_json_from_text(text: str) -> str:
-    """Extract the first JSON object found in a string."""
+# The instructions and the profile are the same for every job, they form a fixed prefix so the provider
+# can reuse its prompt cache, and only the job description in the user message changes.
+SUITABILITY_SYSTEM_PROMPT = """You are a helpful assistant that determines the suitability of my profile with the job description.
+                    The user message is a job description. Do you think I am a suitable match for this job? 
+                    If No, respond with a structured JSON containing "suitable":"No". Strictly follow the schema.  Do not provide any other words "", json, or comma or anything other than this.
+                    If Yes, 
+                    Based on the job description  and profile write a small profile section for a cv. Make sure to include relevant keywords so that it will get detected by ATS.
+                    Based on the job description and profile write a skill section for a cv. Make sure to include relevant skills so that the cv will get detected by ATS.
+                    Respond with a structured JSON containing "suitable":"Yes", "profile":"", "skills":"".
+                    Output only the json schema.  Do not provide any other words "", json, or comma or anything other than this.
+
+                    My profile: {profile}
+                    """
+
+SUITABILITY_PROMPT = """Job description:
+{job_description}"""
+
+# Structured output schema, "suitable" comes first so a rejection can be read before the rest is generated
+SUITABILITY_SCHEMA = {
+    "name": "suitability",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "suitable": {"type": "string", "enum": ["Yes", "No"]},
+            "profile": {"type": "string"},
+            "skills": {"type": "string"}
+        },
+        "required": ["suitable", "profile", "skills"],
+        "additionalProperties": False
+    }
+}
+
+# Matches the decoded verdict at the start of a streamed answer
+STREAMED_VERDICT = re.compile(r'^\s*\{\s*"suitable"\s*:\s*"(Yes|No)"')
+
+
+def parse_suitability_message(message: str) -> dict:
+    """Turn the text answer of ChatGPT into the suitability dictionary."""
+    # Extract JSON from the message
+    json_string = extract_json_from_text(message)
+    if not json_string:
+        return {"error": "No JSON found", "message": message}
     try:
-        # Use regular expression to find a JSON object in the string
-        json_match = re.search(r'\{.*\}', text, re.DOTALL)
-        if json_match:
-            print(json_match.group(0))
-            return json_match.group(0)
-        else:
-            return None
-    except re.error as e:
-        print(f"Regex error: {e}")
-        return None
+        # Attempt to parse the JSON string
+        return json.loads(json_string)
+    except json.JSONDecodeError:
+        return {"error": "JSON parsing error", "message": json_string}
 
 
+@traced()
 def ask_chatgpt(job_description: str) -> dict:
     """Send the job description and profile to GPT and get a structured response."""
     try:
-        headers = {
-            'Content-Type': 'application/json',
-            'Authorization': f'Bearer {config.api_key}'
-        }
-
+        job_description = trim_to_tokens(job_description)
         data = {
             "model": "gpt-4o-mini",  # Replace with the model you have access to
             "messages": [
                 {"role": "system",
-                 "content": "You are a helpful assistant that determines the suitability of my profile with the job description."},
+                 "content": SUITABILITY_SYSTEM_PROMPT.format(profile=config.profile)},
                 {
                     "role": "user",
-                    "content": f"""
-                    Given the following profile: {config.profile}
-                    And the following job description:
-                    {job_description}
-
-                    Do you think I am a suitable match for this job? 
-                    If No, respond with a structured JSON containing "suitable":"No". Strictly follow the schema.  Do not provide any other words "", json, or comma or anything other than this.
-                    If Yes, 
-                    Based on the job description  and profile write a small profile section for a cv. Make sure to include relevant keywords so that it will get detected by ATS.
-                    Based on the job description and profile write a skill section for a cv. Make sure to include relevant skills so that the cv will get detected by ATS.
-                    Respond with a structured JSON containing "suitable":"Yes", "profile":"", "skills":"".
-                    Output only the json schema.  Do not provide any other words "", json, or comma or anything other than this.
-                    """
+                    "content": SUITABILITY_PROMPT.format(job_description=job_description)
                 }
             ],
             "max_tokens": 1200,
             "n": 1,
             "temperature": 1.0
         }
-
-        response = requests.post('https://api.openai.com/v1/chat/completions', headers=headers, data=json.dumps(data),
-                                 timeout=10)
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        message = response.json()['choices'][0]['message']['content'].strip()
+        output_mode = config.suitability_output.lower()
+        if output_mode in ("json", "stream"):
+            data["response_format"] = {"type": "json_schema", "json_schema": SUITABILITY_SCHEMA}
+
+        # Reposted jobs and jobs found under several keywords are answered from the cache
+        cache = get_response_cache()
+        # The output mode is part of the key, a free text answer is not served to the schema modes
+        key = cache_key(data["model"], SUITABILITY_SYSTEM_PROMPT, SUITABILITY_PROMPT, config.profile,
+                        job_description, output_mode, data.get("response_format"))
+        if cache is not None:
+            cached_message = cache.get(key)
+            if cached_message is not None:
+                print("Suitability answer found in the response cache")
+                get_token_usage().record_cache_hit("suitability", estimate_tokens(
+                    data["messages"][0]["content"] + data["messages"][1]["content"]))
+                return parse_suitability_message(cached_message)
+
+        if output_mode == "stream":
+            message = stream_suitability(data)
+        else:
+            answer = get_llm_client().chat(data, timeout=10)
+            get_token_usage().record("suitability", answer.get("usage"))
+            message = answer['choices'][0]['message']['content'].strip()
         # print(message)
-        # Extract JSON from the message
-        json_string = extract_json_from_text(message)
-        if not json_string:
-            return {"error": "No JSON found", "message": message}
-        try:
-            # Attempt to parse the JSON string
-            data = json.loads(json_string)
-            # print(data)
-            return data
-
-        except json.JSONDecodeError:
-            return {"error": "JSON parsing error", "message": json_string}
+        result = parse_suitability_message(message)
+        if cache is not None and "error" not in result:
+            cache.put(key, message)
+        return result
 
     except requests.exceptions.RequestException as e:
         return {"error": "Request error", "message": str(e)}
+    except ValueError as e:
+        # An answer or streamed chunk that is not valid JSON
+        return {"error": "Invalid response", "message": str(e)}
 
 
-def update_resume_with_json(data: dict, template_path: str):
-    """Update the Word document with profile and skills from the JSON output, and manage resume file renaming."""
+def stream_suitability(data: dict) -> str:
+    """Stream the suitability answer and stop reading as soon as it decodes to "suitable":"No"."""
+    data = dict(data, stream_options={"include_usage": True})
+    parts = []
+    usage = None
+    stream = get_llm_client().stream_chat(data, timeout=10)
+    try:
+        for chunk in stream:
+            if chunk.get("usage"):
+                usage = chunk["usage"]
+            for choice in chunk.get("choices") or []:
+                parts.append((choice.get("delta") or {}).get("content") or "")
+            verdict = STREAMED_VERDICT.match("".join(parts))
+            if verdict and verdict.group(1) == "No":
+                # Most jobs are rejections, the empty profile and skills are not worth waiting for
+                print("Suitability answer No, stopped the stream early")
+                usage = {"prompt_tokens": estimate_tokens(data["messages"][0]["content"]
+                                                          + data["messages"][1]["content"]),
+                         "completion_tokens": estimate_tokens("".join(parts))}
+                return '{"suitable": "No"}'
+    finally:
+        stream.close()
+        get_token_usage().record("suitability", usage)
+    return "".join(parts).strip()
+
+
+def update_resume_with_json(data: dict, template_path: str, output_path: str = None):
+    """Render a resume with the profile and skills from the JSON output from the precompiled template."""
     if "profile" not in data or "skills" not in data:
         print("Invalid JSON data")
-        return
-
-    profile = data["profile"]
-    skills = data["skills"]
-
-    current_resume = config.current_resume
-
-    # Create a new resume from the template
-    shutil.copy(template_path, current_resume)
-
-    # Load the new Word document (Current - resume.docx)
-    doc = Document(current_resume)
-
-    # Define a function to set font to Times New Roman, size 12, and remove bold formatting
-    def format_paragraph(paragraph):
-        for run in paragraph.runs:
-            run.font.name = config.font
-            run.font.size = Pt(config.size)
-            run.font.bold = config.bold
-            # Ensure Times New Roman for each run by modifying the font element
-            rFonts = OxmlElement('w:rFonts')
-            rFonts.set(qn('w:ascii'), config.font)
-            rFonts.set(qn('w:hAnsi'), config.font)
-            run._r.get_or_add_rPr().append(rFonts)
-
-    # Iterate through paragraphs and replace placeholders, then apply formatting
-    for paragraph in doc.paragraphs:
-        if "<*profile*>" in paragraph.text:
-            paragraph.text = paragraph.text.replace("<*profile*>", profile)
-            format_paragraph(paragraph)
-        if "<*skills*>" in paragraph.text:
-            paragraph.text = paragraph.text.replace("<*skills*>", skills)
-            format_paragraph(paragraph)
-
-    # Save the modified document
-    doc.save(current_resume)
-    print(f"Resume updated successfully as {current_resume}")
+        return None
 
+    # Without an output path the shared "Current - resume.docx" scratch file is used
+    current_resume = output_path or config.current_resume
 
-def move_resume(job_title: str, job_id: str):
-    try:
-        current_resume = "Current - resume.docx"
-        # Define the paths
-        resume_folder = config.resume_folder
-        os.makedirs(resume_folder, exist_ok=True)
-
-        new_resume_name = f"{job_title} - {job_id}.docx"
-        new_resume_path = os.path.join(resume_folder, new_resume_name)
-
-        # Check if "Current - resume.docx" exists and rename it to the last job's title and ID
-        if os.path.exists(current_resume):
-            shutil.move(current_resume, new_resume_path)
-            print(f"Renamed template to {new_resume_name} and moved it to {resume_folder}")
-            return new_resume_path
-    except:
-        print("Move error or already file moved")
-        return None
+    get_resume_template(template_path).render({config.placeholders["profile_placeholder"]: data["profile"],
+                                               config.placeholders["skills_placeholder"]: data["skills"]},
+                                              current_resume)
+    print(f"Resume updated successfully as {current_resume}")
+    return current_resume
+
+
+def resume_path_for(job_title: str, job_id: str) -> str:
+    """Return the path of the tailored resume of a job inside the resume folder."""
+    os.makedirs(config.resume_folder, exist_ok=True)
+    return os.path.join(config.resume_folder, f"{job_title} - {job_id}.docx")
+
+
+# Reads title, link, company, location and date of every job card on a results page in one WebDriver call.
+# List items without a job title (spacers, ads) are left out.
+LISTING_CARDS_SCRIPT = """
+const text = (el) => el ? (el.innerText || '').trim() : '';
+const cards = [];
+document.querySelectorAll('ul.css-zu9cdh li').forEach((li) => {
+    const title = li.querySelector('h2.jobTitle a');
+    if (!title) return;
+    const date = li.querySelector('div.job_seen_beacon span.css-qvloho.eu4oa1w0');
+    cards.push({
+        job_id: title.getAttribute('data-jk'),
+        title: text(title),
+        url: title.href,
+        company: text(li.querySelector("span[data-testid='company-name']")),
+        location: text(li.querySelector("div[data-testid='text-location']")),
+        date: date ? text(date) : null
+    });
+});
+return cards;
+"""
+
+
+def parse_posting_date(date_text) -> str:
+    """Turn the "Posted 3 days ago" text of a job card into a date."""
+    if date_text is None:
+        return "Not available"
+    today = datetime.today()
+    days_ago = [int(s) for s in date_text.split() if s.isdigit()]
+
+    if len(days_ago) > 0:
+        date_t = timedelta(days=days_ago[0])
+        return (today - date_t).strftime('%Y-%m-%d')
+    elif "just posted" in date_text.lower():
+        return today.strftime('%Y-%m-%d')
+    else:
+        print(f"Failed to get date: defaulting to today's date")
+        return today.strftime('%Y-%m-%d')
 
 
 def parse_gpt_response(data: dict) -> str:
@@ -178,11 +244,52 @@ def parse_gpt_response(data: dict) -> str:
 
 
 class IndeedAutoApplyBot:
-    def __init__(self) -> None:
+    def __init__(self, launch_browser: bool = True, profile_dir: str = None, parent=None) -> None:
+        self.browser = None
+        # Consecutive cards stored by earlier runs, paging a keyword stops at config.known_jobs_stop
+        self.known_streak = 0
+        if launch_browser:
+            self.launch_browser(profile_dir)
+
+        # Open the job store, the CSV files are only written when exported
+        self.master_csv = config.master_csv
+        self.latest_csv = config.latest_csv
+        if parent is not None:
+            # Browser pool workers share the store, run, registry and scoring pipeline of the bot that started them
+            self.store = parent.store
+            self.run_id = parent.run_id
+            self.queued_jobs = parent.queued_jobs
+            self.registry_lock = parent.registry_lock
+            self.apply_lock = parent.apply_lock
+            self.pipeline = parent.pipeline
+            self.resumes = parent.resumes
+            self.checkpoint = None
+            self.apply_worker = None
+            return
+        self.store = JobStore(config.job_store_db, config.store_batch_size)
+        if self.store.is_empty() and os.path.exists(self.master_csv):
+            # Migrate the history of an existing master CSV file once
+            self.store.import_csv(self.master_csv)
+        self.run_id = self.store.start_run()
+
+        # Jobs claimed by a browser or waiting in the scoring pipeline, they are not in the store yet
+        self.queued_jobs = set()
+        self.registry_lock = threading.Lock()
+        # Applications share the answers HTML scratch file, so only one browser applies at a time
+        self.apply_lock = threading.Lock()
+        self.pipeline = None
+        # Resumes are written on a process pool, scraping and scoring do not wait for them
+        self.resumes = ResumeRenderService(template_path, config.resume_workers)
+        # Position of the browser scrape loop, saved so a crashed run can be resumed
+        self.checkpoint = None
+        # Applies for the queued jobs next to scraping when apply_mode is "parallel"
+        self.apply_worker = None
+
+    def launch_browser(self, profile_dir: str = None) -> None:
         chrome_options = webdriver.ChromeOptions()
 
         # Define the profile directory
-        profile_dir = os.path.join(os.getcwd(), 'chrome_profile')
+        profile_dir = profile_dir or os.path.join(os.getcwd(), config.chrome_profile_dir)
 
         # Create the profile directory if it doesn't exist
         if not os.path.exists(profile_dir):
@@ -198,19 +305,20 @@ class IndeedAutoApplyBot:
         # Keep the browser open after the script ends
         chrome_options.add_experimental_option("detach", True)
 
+        if config.headless.lower() == "yes":
+            chrome_options.add_argument("--headless=new")
+        if fast_browser.is_enabled():
+            fast_browser.add_fast_options(chrome_options)
+
         # Initialize the browser with the specified options
         self.browser = webdriver.Chrome(options=chrome_options)
+        if fast_browser.is_enabled():
+            # Before the first page, so the homepage is already loaded without them
+            fast_browser.block_resources(self.browser)
         url = config.indeed_homepage_url
         self.browser.get(url)
-        time.sleep(random.uniform(1.5, 3.0))  # Random delay
-
-        # Load or create the master CSV file
-        self.master_csv = config.master_csv
-        self.latest_csv = config.latest_csv
-        self.processed_jobs = self.load_master_csv()
-
-        # Prepare the latest run CSV file
-        self.prepare_latest_csv()
+        pacing.wait_for(self.browser, EC.presence_of_element_located((By.NAME, "q")))
+        pacing.humanize("page")
 
     def close_popups(self):
         """Close popups by sending ESCAPE and ENTER keys only if a close button is visible."""
@@ -226,12 +334,14 @@ class IndeedAutoApplyBot:
                 # Send the Escape key to close popups
                 self.browser.find_element(By.TAG_NAME, 'body').send_keys(Keys.ESCAPE)
                 print("Sent ESCAPE key to close popup.")
-                time.sleep(0.5)  # Wait briefly after sending escape key
+                # Wait until the popup is gone instead of a fixed pause
+                pacing.wait_for(self.browser, pacing.element_hidden(close_button), timeout=2)
+                pacing.humanize("popup")
 
                 # Send the Enter key if needed (in case a confirmation dialog appears)
                 self.browser.find_element(By.TAG_NAME, 'body').send_keys(Keys.ENTER)
                 print("Sent ENTER key to confirm closing popup.")
-                time.sleep(0.5)  # Wait briefly after sending enter key
+                pacing.humanize("popup")
 
 
         except NoSuchElementException:
@@ -252,66 +362,63 @@ class IndeedAutoApplyBot:
                 print(f"Error encountered: {e}. Attempting to close popups and retry...")
                 self.close_popups()  # Attempt to close popups
                 attempt += 1
-                time.sleep(2)  # Give some time for the popup to close
+                pacing.humanize("action")
         return False  # Return False if all retries fail
 
-    def load_master_csv(self):
-        """Load the master CSV file if it exists, otherwise create it."""
-        if os.path.exists(self.master_csv):
-            with open(self.master_csv, mode='r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                return set(row["Job ID"] for row in reader)
-        else:
-            with open(self.master_csv, mode='w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(
-                    ["Job Title", "Company Name", "Location", "Job Description", "Posting Date", "Apply Link",
-                     "Job Listing URL", "Job ID", "Date Recorded", "Internal apply", "Resume path", "AI answer",
-                     "Suitability", "Application status"])
-            return set()
-
-    def prepare_latest_csv(self):
-        """Create the latest run CSV file with headers."""
-        with open(self.latest_csv, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            writer.writerow(["Job Title", "Company Name", "Location", "Job Description", "Posting Date", "Apply Link",
-                             "Job Listing URL", "Job ID", "Date Recorded", "Internal apply", "Resume path",
-                             "AI answer", "Suitability", "Application status"])
+    def export_csv_files(self):
+        """Export the whole job history and the jobs of this run to the master and latest CSV files."""
+        self.store.flush()
+        self.store.export_csv(self.master_csv)
+        self.store.export_csv(self.latest_csv, run_id=self.run_id)
 
+    @traced("typing")
     def simulate_typing(self, element, text):
         """Simulate human-like typing in an input field."""
+        if not pacing.is_humanized():
+            element.send_keys(text)
+            return
         for char in text:
             element.send_keys(char)
-            time.sleep(random.uniform(0.05, 0.2))  # Random delay between keystrokes
+            pacing.humanize("keystroke")  # Random delay between keystrokes
 
+    @traced()
     def find_job(self, job_search_keyword: str) -> None:
         """Search for a job with the specified keyword."""
         query_input = self.browser.find_element(By.NAME, value="q")
         query_input.clear()  # Clear the previous keyword
 
         self.simulate_typing(query_input, job_search_keyword)
-        time.sleep(random.uniform(0.5, 1.5))
+        pacing.humanize("action")
 
         clear_btn = self.browser.find_element(By.XPATH,
                                               value='//*[@id="jobsearch"]/div/div[1]/div[1]/div/div/span/span[2]')
         ActionChains(self.browser).move_to_element(clear_btn).click().perform()
-        time.sleep(random.uniform(0.5, 1.5))
+        pacing.humanize("action")
 
         self.simulate_typing(query_input, job_search_keyword)
-        time.sleep(random.uniform(0.5, 1.5))
+        pacing.humanize("action")
 
         find_btn = self.browser.find_element(By.XPATH, "//button[contains(text(), 'Find jobs')]")
+        previous_list = self.current_job_list()
         ActionChains(self.browser).move_to_element(find_btn).click().perform()
-        time.sleep(random.uniform(1.5, 3.0))  # Random delay
+        pacing.wait_for(self.browser, pacing.job_list_loaded(previous_list))
+        pacing.humanize("page")
 
         try:
             date_btn = self.browser.find_element(By.XPATH, value='//*[@id="dateLabel"]')
+            previous_list = self.current_job_list()
             ActionChains(self.browser).move_to_element(date_btn).click().perform()
-            time.sleep(random.uniform(1.5, 3.0))  # Random delay
+            pacing.wait_for(self.browser, pacing.job_list_loaded(previous_list))
+            pacing.humanize("page")
 
         except NoSuchElementException:
             print("Date sort error")
 
+    def current_job_list(self):
+        """Return the job list element of the open results page, used to notice when it is replaced."""
+        elements = self.browser.find_elements(By.CSS_SELECTOR, pacing.JOB_LIST_SELECTOR)
+        return elements[0] if elements else None
+
     def extract_job_id(self, url):
         """Extract the job ID from the Indeed job URL."""
         parsed_url = urlparse(url)
@@ -321,6 +428,13 @@ class IndeedAutoApplyBot:
 
     def click_reject_all_button(self):
         """Wait for the page to load and click the 'Reject All' button if it exists."""
+        if fast_browser.is_enabled():
+            # The cookie banner scripts are blocked in fast mode, only a banner already on the page is closed
+            buttons = self.browser.find_elements(By.ID, "onetrust-reject-all-handler")
+            if buttons and buttons[0].is_displayed():
+                buttons[0].click()
+                print("Clicked the 'Reject All' button.")
+            return
         try:
             # Wait for the page to finish loading and for the button to be present in the DOM
             WebDriverWait(self.browser, 10).until(
@@ -342,178 +456,468 @@ class IndeedAutoApplyBot:
         except Exception as e:
             print(f"An error occurred while trying to click the 'Reject All' button: {e}")
 
+    def score_jobs(self, records: list) -> dict:
+        """Return the ChatGPT verdict of every job record as {job_id: data}."""
+        # Reposts of jobs scored before reuse their verdict
+        records, reused = self.reuse_duplicates(records)
+        # Jobs with little in common with the profile are not sent to ChatGPT
+        records, filtered = prefilter_jobs(records)
+        filtered.update(reused)
+
+        scoring_mode = config.scoring_mode.lower()
+        if scoring_mode == "offline":
+            # Scored later through a Batch API file, see batch_scoring.py
+            filtered.update({record["job_id"]: {"suitable": PENDING_SUITABILITY} for record in records})
+            return filtered
+
+        verdicts = {}
+        if scoring_mode == "batch" and len(records) > 1:
+            verdicts = ask_chatgpt_batch({record["job_id"]: record["job_description"] for record in records})
+        for record in records:
+            # Jobs missing from a batch answer are asked again one by one
+            verdict = verdicts.get(record["job_id"])
+            if verdict is None or "error" in verdict:
+                verdicts[record["job_id"]] = ask_chatgpt(record["job_description"])
+        verdicts.update(filtered)
+        return verdicts
+
+    def reuse_duplicates(self, records: list):
+        """Split job records into (records to score, {job_id: verdict of an earlier posting of the same job})."""
+        remaining = []
+        verdicts = {}
+        for record in records:
+            duplicate = find_near_duplicate(self.store, record["job_id"], record["job_description"])
+            if duplicate is None:
+                remaining.append(record)
+                continue
+            duplicate_id, suitability, response, resume_path = duplicate
+            print(f"Job {record['job_id']} is a repost of job {duplicate_id}, reusing its verdict")
+            record["duplicate_resume"] = resume_path
+            verdicts[record["job_id"]] = dict(response, suitable=suitability, duplicate_of=duplicate_id)
+        return remaining, verdicts
+
+    def process_jobs(self, records: list) -> None:
+        """Score a group of scraped jobs, tailor the resumes and store the results. Runs on the scoring workers."""
+        verdicts = self.score_jobs(records)
+        for record in records:
+            self.finish_job(record, verdicts[record["job_id"]])
+
+    def process_job(self, record: dict, internal_apply_button=None) -> None:
+        """Score a single job inline, used when internal_apply_button is given for auto-apply."""
+        _, verdicts = self.reuse_duplicates([record])
+        if not verdicts:
+            _, verdicts = prefilter_jobs([record])
+        data = verdicts.get(record["job_id"]) or ask_chatgpt(record["job_description"])
+        self.finish_job(record, data, internal_apply_button)
+
+    @traced("finish_job")
+    def finish_job(self, record: dict, data: dict, internal_apply_button=None) -> None:
+        """Tailor the resume, apply if requested and store the result of a scored job."""
+        job_title = record["job_title"]
+        job_id = record["job_id"]
+        suitability = parse_gpt_response(data)
+
+        resume_path = None
+        resume_future = None
+        gpt_answer = None
+        application_status = None
+        queue_application = False
+        if suitability == "Yes":
+            application_status = "Not applied"
+            if is_deferred() and record.get("internal_apply") == "Yes":
+                # Applied for by the apply worker once the resume is written, scraping goes on meanwhile
+                queue_application = True
+                application_status = "Queued"
+            if record.get("duplicate_resume") and os.path.exists(record["duplicate_resume"]):
+                # A repost uses the resume tailored for the earlier posting
+                resume_path = record["duplicate_resume"]
+            else:
+                # Rendered on the resume workers, straight into the resume folder
+                resume_future = self.resumes.submit(data, resume_path_for(job_title, job_id))
+                resume_path = resume_path_for(job_title, job_id) if resume_future is not None else None
+                if internal_apply_button is not None and resume_future is not None:
+                    # The apply flow uploads this job's resume, so it waits for it to be written
+                    try:
+                        resume_future.result()
+                    except Exception as e:
+                        print(f"Failed to render the resume of job {job_id}: {e}")
+                        resume_path = None
+            if queue_application and resume_path is None:
+                # No resume was written, e.g. the answer had no profile or skills, so there is nothing to apply with
+                queue_application = False
+                application_status = "Not queued"
+            if internal_apply_button is not None and resume_path is not None:
+                with self.apply_lock:
+                    if self.checkpoint is not None:
+                        self.checkpoint.start_application(record)
+                    gpt_answer, application_status = apply_for_job(self.browser, internal_apply_button,
+                                                                   resume_file_name=resume_path)
+                    if self.checkpoint is not None:
+                        self.checkpoint.finish_application()
+                    html_path = move_html(job_title, job_id)
+
+        record.update({
+            "date_recorded": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "resume_path": resume_path,
+            "ai_answer": gpt_answer,
+            "suitability": suitability,
+            "application_status": application_status
+        })
+        self.store.add_job(record, run_id=self.run_id, llm_response=data)
+        self.store.remove_pending(job_id)
+        remember_fingerprint(self.store, job_id, record.get("job_description"))
+        self.release_job(job_id)
+        if resume_future is not None:
+            # Added after the job is stored, so a failed render can clear the stored path
+            resume_future.add_done_callback(lambda future: self.resume_done(record, future, queue_application))
+        elif queue_application and resume_path is not None:
+            self.store.enqueue_application(record, resume_path)
+
+    def resume_done(self, record: dict, future, queue_application: bool = False) -> None:
+        job_id = record["job_id"]
+        if future.exception() is not None:
+            print(f"Failed to render the resume of job {job_id}: {future.exception()}")
+            self.store.set_resume_path(job_id, None)
+            if queue_application:
+                self.store.save_application(job_id, None, "Not applied")
+        elif queue_application:
+            self.store.enqueue_application(record, record["resume_path"])
+
+    def extract_listing_cards(self) -> list:
+        """Read every job card of the current results page with one script call."""
+        return self.browser.execute_script(LISTING_CARDS_SCRIPT) or []
+
+    def read_apply_link(self):
+        """Return (internal apply found, apply link, internal apply button) for the open job."""
+        internal_apply_button_found = "No"  # Flag to track if the internal apply button is found
+        apply_link = "Apply link not found"
+        internal_apply_button = None  # Initialize variable
+
+        try:
+            # Try to find the internal apply button
+            internal_apply_button = self.browser.find_element(By.ID, "indeedApplyButton")
+            # Set flag to Yes since the internal button exists
+            internal_apply_button_found = "Yes"
+            apply_link = self.browser.current_url  # Assuming internal apply redirects to the current URL
+
+        except NoSuchElementException:
+            try:
+                # Try to find the external apply button using corrected XPath
+                external_apply_button = self.browser.find_element(By.XPATH,
+                                                                  "//button[.//span[text()='Apply now']]")
+                apply_link = external_apply_button.get_attribute("href")
+
+                # Check if the href attribute is found
+                if not apply_link:
+                    apply_link = "Apply link not available"
+
+            except NoSuchElementException:
+                try:
+                    # Try alternative CSS selector for external apply button
+                    external_apply_button = self.browser.find_element(By.CSS_SELECTOR,
+                                                                      "div#applyButtonLinkContainer button")
+                    apply_link = external_apply_button.get_attribute("href")
+
+                    if not apply_link:
+                        apply_link = "Apply link not available"
+
+                except NoSuchElementException:
+                    # Apply link not found
+                    apply_link = "Apply link not found"
+
+        return internal_apply_button_found, apply_link, internal_apply_button
+
+    def is_known_job(self, job_id: str) -> bool:
+        return job_id in self.queued_jobs or self.store.is_processed(job_id)
+
+    def is_earlier_job(self, job_id: str) -> bool:
+        """True for a job stored by an earlier run, jobs of this run found under another keyword do not count."""
+        return self.store.is_processed_before(job_id, self.run_id)
+
+    def claim_job(self, job_id: str) -> bool:
+        """Reserve a new job for this browser, False when it is already processed or claimed by another worker."""
+        with self.registry_lock:
+            if self.is_known_job(job_id):
+                return False
+            self.queued_jobs.add(job_id)
+            return True
+
+    def release_job(self, job_id: str) -> None:
+        with self.registry_lock:
+            self.queued_jobs.discard(job_id)
+
+    def handle_record(self, record: dict, internal_apply_button=None) -> None:
+        """Send a scraped job to the scoring workers, or score it inline when it is auto-applied."""
+        # Auto-apply needs the browser on this job, everything else is scored off the loop
+        apply_inline = (record["internal_apply"] == "Yes" and config.auto_apply.lower() == "yes"
+                        and not is_deferred() and self.browser is not None)
+        if apply_inline and internal_apply_button is None:
+            internal_apply_button = self.open_job_page(record)
+            apply_inline = internal_apply_button is not None
+
+        if self.pipeline is not None and not apply_inline:
+            with self.registry_lock:
+                self.queued_jobs.add(record["job_id"])
+            # Kept in the store until it is scored, a crashed run picks it up again
+            self.store.add_pending(record)
+            self.pipeline.submit(record)
+        elif apply_inline:
+            self.process_job(record, internal_apply_button)
+        else:
+            self.process_jobs([record])
+
+    def open_job_page(self, record: dict):
+        """Open a job found by the HTTP crawler in Chrome and return its internal apply button."""
+        self.browser.get(record["apply_link"])
+        try:
+            return WebDriverWait(self.browser, 10).until(
+                EC.presence_of_element_located((By.ID, "indeedApplyButton")))
+        except TimeoutException:
+            print(f"Internal apply button not found for job {record['job_id']}")
+            return None
+
+    @traced("results_page")
+    def scrape_results_page(self) -> int:
+        """Open every new job of the current results page, hand it to the scoring stage and return the card count."""
+        cards = self.extract_listing_cards()
+        # Cards handed off before a crash are stored or pending, claim_job skips them on resume
+        for card in cards:
+            if self.reached_known_jobs():
+                print(f"{self.known_streak} jobs in a row were processed by earlier runs, the rest is older")
+                break
+            job_title_element = None
+            job_id = None
+            handed_off = False
+            try:
+                job_listing_url = card["url"]
+                job_id = card["job_id"] or self.extract_job_id(job_listing_url)
+                if job_id is None or not self.claim_job(job_id):
+                    print(f"Skipping already processed job ID: {job_id}")
+                    if job_id is not None and self.is_earlier_job(job_id):
+                        self.known_streak += 1
+                    job_id = None
+                    continue
+                self.known_streak = 0
+
+                job_title = card["title"]
+
+                # Only the cards that are opened need a WebElement
+                job_title_element = self.browser.find_element(
+                    By.CSS_SELECTOR, f"h2.jobTitle a[data-jk='{job_id}'], h2.jobTitle a[href*='jk={job_id}']")
+
+                previous_descriptions = self.browser.find_elements(By.ID, "jobDescriptionText")
+                try:
+                    previous_text = previous_descriptions[0].text if previous_descriptions else None
+                except StaleElementReferenceException:
+                    previous_descriptions, previous_text = [], None
+
+                # Try clicking the job title element with retries
+                with span("card_click"):
+                    clicked = self.try_click(job_title_element)
+                if not clicked:
+                    print(f"Failed to click job title after multiple retries: {job_title}")
+                    continue
+
+                # Wait for the description of the clicked job rather than a fixed pause
+                with span("description_load"):
+                    description_element = pacing.wait_for(self.browser, pacing.job_details_loaded(
+                        job_id, previous_descriptions[0] if previous_descriptions else None, previous_text))
+                    if description_element is None:
+                        description_element = self.browser.find_element(By.ID, "jobDescriptionText")
+                    job_description = description_element.text
+                pacing.humanize("click")
+
+                internal_apply_button_found, apply_link, internal_apply_button = self.read_apply_link()
+
+                record = {
+                    "job_title": job_title,
+                    "company_name": card["company"],
+                    "location": card["location"],
+                    "job_description": job_description,
+                    "posting_date": parse_posting_date(card["date"]),
+                    "apply_link": apply_link,
+                    "job_listing_url": job_listing_url,
+                    "job_id": job_id,
+                    "internal_apply": internal_apply_button_found
+                }
+                self.handle_record(record, internal_apply_button)
+                handed_off = True
+
+            except NoSuchElementException:
+                pass
+            except ElementClickInterceptedException:
+                print("Click was intercepted. Trying to scroll into view and click again.")
+                self.browser.execute_script("arguments[0].scrollIntoView({block: 'center'});",
+                                            job_title_element)
+                ActionChains(self.browser).move_to_element(job_title_element).click().perform()
+                pacing.humanize("click")
+            finally:
+                # A job that was claimed but not scraped can be picked up again from another page
+                if job_id is not None and not handed_off:
+                    self.release_job(job_id)
+
+            # Close any popup that might appear
+            self.close_popups()
+        return len(cards)
+
+    def reached_known_jobs(self) -> bool:
+        """True once known_jobs_stop consecutive cards were processed by earlier runs."""
+        return 0 < config.known_jobs_stop <= self.known_streak
+
+    def scrape_search_page(self, url: str) -> int:
+        """Open a results page by URL and scrape it, used by the browser pool workers."""
+        self.browser.get(url)
+        pacing.wait_for(self.browser, pacing.job_list_loaded(), timeout=5)
+        pacing.humanize("page")
+        self.close_popups()
+        return self.scrape_results_page()
+
+    def spawn_worker(self, profile_dir: str):
+        """Launch another Chrome with its own profile that shares the store, registry and scoring of this bot."""
+        return IndeedAutoApplyBot(profile_dir=profile_dir, parent=self)
+
     def scrape_job_listings(self, job_search_keywords: list) -> None:
         """Scrape each job listing and save details to the CSV files."""
         # Attempt to click the "Reject All" button if it appears
         self.click_reject_all_button()
-        for keyword in job_search_keywords:
-            self.find_job(keyword)  # Search for the current keyword
+        self.start_scoring()
+
+        start_keyword, start_page = 0, 0
+        if config.checkpointing.lower() == "yes":
+            self.checkpoint = RunCheckpoint(self.store, self.run_id, job_search_keywords)
+            start_keyword, start_page = self.checkpoint.resume_point()
+
+        pages_saved = {}
+        for keyword_index, keyword in enumerate(job_search_keywords):
+            if keyword_index < start_keyword:
+                continue  # Finished before the last run stopped
+            self.known_streak = 0
+            page_count = start_page if keyword_index == start_keyword else 0  # Counter of the pages processed
+            if page_count > 0:
+                # Pages covered by the stopped run are skipped by opening the next one directly
+                self.browser.get(search_page_url(config.indeed_base_url, keyword, page_count))
+                pacing.wait_for(self.browser, pacing.job_list_loaded())
+                pacing.humanize("page")
+            else:
+                self.find_job(keyword)  # Search for the current keyword
             is_next_page = True
-            page_count = 0  # Counter to track the number of pages processed
 
             while is_next_page and page_count < config.pagination_limit:
-                job_listings = self.browser.find_elements(By.CSS_SELECTOR, "ul.css-zu9cdh li")
-
-                for job in job_listings:
-                    try:
-                        job_title_element = job.find_element(By.CSS_SELECTOR, "h2.jobTitle a")
-                        job_listing_url = job_title_element.get_attribute("href")
-
-                        job_id = self.extract_job_id(job_listing_url)
-                        if job_id is None or job_id in self.processed_jobs:
-                            print(f"Skipping already processed job ID: {job_id}")
-                            continue
-
-                        job_title = job_title_element.text
-                        company_name = job.find_element(By.CSS_SELECTOR, "span[data-testid='company-name']").text
-                        location = job.find_element(By.CSS_SELECTOR, "div[data-testid='text-location']").text
-
-                        # Try clicking the job title element with retries
-                        if not self.try_click(job_title_element):
-                            print(f"Failed to click job title after multiple retries: {job_title}")
-                            continue
-
-                        time.sleep(random.uniform(2.0, 3.0))  # Random delay after clicking
-
-                        job_description = self.browser.find_element(By.ID, "jobDescriptionText").text
-
-                        try:
-                            # Extract the posting date
-                            date_element = job.find_element(By.CSS_SELECTOR,
-                                                            "div.job_seen_beacon span.css-qvloho.eu4oa1w0").text
-                            today = datetime.today()
-                            days_ago = [int(s) for s in date_element.split() if s.isdigit()]
-
-                            if len(days_ago) > 0:
-                                date_t = timedelta(days=days_ago[0])
-                                final_date = (today - date_t).strftime('%Y-%m-%d')
-                            elif "just posted" in date_element.lower():
-                                final_date = today.strftime('%Y-%m-%d')
-                            else:
-                                print(f"Failed to get date: defaulting to today's date")
-                                final_date = today.strftime('%Y-%m-%d')
-
-                            posting_date = final_date
-                        except NoSuchElementException:
-                            posting_date = "Not available"
-
-                        internal_apply_button_found = "No"  # Flag to track if the internal apply button is found
-                        apply_link = "Apply link not found"
-                        internal_apply_button = None  # Initialize variable
-
-                        try:
-                            # Try to find the internal apply button
-                            internal_apply_button = self.browser.find_element(By.ID, "indeedApplyButton")
-                            # Set flag to Yes since the internal button exists
-                            internal_apply_button_found = "Yes"
-                            apply_link = self.browser.current_url  # Assuming internal apply redirects to the current URL
-
-                        except NoSuchElementException:
-                            try:
-                                # Try to find the external apply button using corrected XPath
-                                external_apply_button = self.browser.find_element(By.XPATH,
-                                                                                  "//button[.//span[text()='Apply now']]")
-                                apply_link = external_apply_button.get_attribute("href")
-
-                                # Check if the href attribute is found
-                                if not apply_link:
-                                    apply_link = "Apply link not available"
-                                internal_apply_button_found = "No"
-
-                            except NoSuchElementException:
-                                try:
-                                    # Try alternative CSS selector for external apply button
-                                    external_apply_button = self.browser.find_element(By.CSS_SELECTOR,
-                                                                                      "div#applyButtonLinkContainer button")
-                                    apply_link = external_apply_button.get_attribute("href")
-
-                                    if not apply_link:
-                                        apply_link = "Apply link not available"
-                                    internal_apply_button_found = "No"
-
-                                except NoSuchElementException:
-                                    # Apply link not found
-                                    apply_link = "Apply link not found"
-                                    internal_apply_button_found = "No"
-
-                        data = ask_chatgpt(job_description)
-                        suitability = parse_gpt_response(data)
-
-                        date_recorded = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-                        resume_path = None
-                        gpt_answer = None
-                        application_status = None
-                        if suitability == "Yes":
-                            update_resume_with_json(data, template_path)
-
-                            if internal_apply_button_found == "Yes" and config.auto_apply.lower() == "yes":
-                                if internal_apply_button is not None:
-                                    gpt_answer, application_status = apply_for_job(self.browser, internal_apply_button,
-                                                                                   resume_file_name=config.current_resume)
-                                else:
-                                    # Handle the case where internal_apply_button is None
-                                    print("Internal apply button not found, cannot proceed with application.")
-                                    gpt_answer = None
-                                    application_status = "Failed to apply - internal apply button not found"
-                            else:
-                                gpt_answer = None
-                                application_status = "Not applied"
-
-                            resume_path = move_resume(job_title, job_id)
-                            html_path = move_html(job_title, job_id)
-
-                        with open(self.master_csv, mode='a', newline='', encoding='utf-8') as master_file:
-                            master_writer = csv.writer(master_file)
-                            master_writer.writerow(
-                                [job_title, company_name, location, job_description, posting_date, apply_link,
-                                 job_listing_url, job_id, date_recorded, internal_apply_button_found, resume_path,
-                                 gpt_answer, suitability, application_status])
-
-                        with open(self.latest_csv, mode='a', newline='', encoding='utf-8') as latest_file:
-                            latest_writer = csv.writer(latest_file)
-                            latest_writer.writerow(
-                                [job_title, company_name, location, job_description, posting_date, apply_link,
-                                 job_listing_url, job_id, date_recorded, internal_apply_button_found, resume_path,
-                                 gpt_answer, suitability, application_status])
-
-                        self.processed_jobs.add(job_id)
-
-                    except NoSuchElementException:
-                        pass
-                    except ElementClickInterceptedException:
-                        print("Click was intercepted. Trying to scroll into view and click again.")
-                        self.browser.execute_script("arguments[0].scrollIntoView({block: 'center'});",
-                                                    job_title_element)
-                        ActionChains(self.browser).move_to_element(job_title_element).click().perform()
-                        time.sleep(random.uniform(2.0, 3.0))
-
-                    # Close any popup that might appear
-                    self.close_popups()
+                if self.checkpoint is not None:
+                    self.checkpoint.advance(keyword_index, page_count)
+                self.scrape_results_page()
 
                 page_count += 1
 
-                if page_count < 3:
+                if self.reached_known_jobs():
+                    # The rest of the results was seen by an earlier run
+                    if page_count < config.pagination_limit and self.browser.find_elements(
+                            By.XPATH, '//a[@data-testid="pagination-page-next"]'):
+                        pages_saved[keyword] = config.pagination_limit - page_count
+                    is_next_page = False
+                elif page_count < config.pagination_limit:
                     try:
                         next_page_button = self.browser.find_element(By.XPATH,
                                                                      '//a[@data-testid="pagination-page-next"]')
                         self.browser.execute_script("arguments[0].scrollIntoView({block: 'center'});",
                                                     next_page_button)
+                        previous_list = self.current_job_list()
                         ActionChains(self.browser).move_to_element(next_page_button).click().perform()
-                        time.sleep(random.uniform(2.0, 3.0))  # Wait for the next page to load
+                        # Wait for the next page to replace the job list
+                        pacing.wait_for(self.browser, pacing.job_list_loaded(previous_list))
+                        pacing.humanize("page")
                     except NoSuchElementException:
                         is_next_page = False  # If no next page, exit the loop
                 else:
-                    is_next_page = False  # Stop after 3 pages
+                    is_next_page = False  # Stop after pagination_limit pages
+
+        if pages_saved:
+            print(f"Stopped early at jobs processed by earlier runs, pages not opened: {pages_saved}")
+        self.finish_run()
+        if self.checkpoint is not None:
+            # Cleared only once the scored jobs are stored, the next run starts from the first keyword
+            self.checkpoint.finish()
+            self.checkpoint = None
+
+    def pool_job_listings(self, job_search_keywords: list) -> None:
+        """Spread the results pages of the keywords over browser_workers Chrome instances and save the jobs."""
+        self.start_scoring()
+        BrowserPool(self, config.browser_workers).run(job_search_keywords)
+        self.finish_run()
+
+    def crawl_job_listings(self, job_search_keywords: list) -> None:
+        """Fetch the search and job pages over HTTP and save details to the job store, Chrome is only used to apply."""
+        self.start_scoring()
+        crawler = HttpCrawler(self.is_known_job, self.handle_record, parse_posting_date,
+                              is_earlier=self.is_earlier_job)
+        crawler.crawl(job_search_keywords)
+        self.finish_run()
+
+    def start_scoring(self) -> None:
+        if config.llm_workers > 0:
+            batch_size = config.scoring_batch_size if config.scoring_mode.lower() == "batch" else 1
+            self.pipeline = ScoringPipeline(self.process_jobs, config.llm_workers, config.pipeline_queue_size,
+                                            batch_size, release_job=self.release_job)
+            self.pipeline.start()
+        if is_deferred() and config.apply_mode.lower() == "parallel":
+            self.apply_worker = ApplyWorker(self.store)
+            self.apply_worker.start(self)
+        self.resume_pending_jobs()
+
+    def resume_pending_jobs(self) -> None:
+        """Score the jobs that were still queued for the scoring workers when the last run stopped."""
+        records = [record for record in self.store.pending_jobs() if not self.store.is_processed(record["job_id"])]
+        if not records:
+            return
+        print(f"Scoring {len(records)} jobs left unscored by the last run")
+        for record in records:
+            with self.registry_lock:
+                self.queued_jobs.add(record["job_id"])
+            if self.pipeline is not None:
+                self.pipeline.submit(record)
+            else:
+                self.process_jobs([record])
+
+    def finish_run(self) -> None:
+        """Wait for the scoring workers, then flush the store and export the CSV files."""
+        if self.pipeline is not None:
+            self.pipeline.close()
+            self.pipeline = None
+        self.resumes.close()
+        if self.apply_worker is not None:
+            # After the resumes, whose completion queues the last applications
+            self.apply_worker.close()
+            self.apply_worker = None
+
+        cache = get_response_cache()
+        if cache is not None:
+            print(f"OpenAI response cache: {cache.stats()}")
+        print(get_token_usage().report())
+
+        self.store.flush()
+        if config.export_csv.lower() == "yes":
+            self.export_csv_files()
 
 
 if __name__ == "__main__":
+    # Parse the resume template once before scraping starts
+    get_resume_template(template_path)
+
     if not config.api_key:
         print("Error: The API key is empty. The program wont identify sutiable jobs, it will only scrape")
 
     JOB_SEARCH = config.job_search_keywords
-    bot = IndeedAutoApplyBot()
-    bot.scrape_job_listings(JOB_SEARCH)
+    if config.crawl_engine.lower() == "http":
+        # Chrome is only needed to apply for jobs, the apply worker has its own
+        bot = IndeedAutoApplyBot(launch_browser=config.auto_apply.lower() == "yes" and not is_deferred())
+        bot.crawl_job_listings(JOB_SEARCH)
+    elif config.browser_workers > 1:
+        # Every pool worker launches its own Chrome
+        bot = IndeedAutoApplyBot(launch_browser=False)
+        bot.pool_job_listings(JOB_SEARCH)
+    else:
+        bot = IndeedAutoApplyBot()
+        bot.scrape_job_listings(JOB_SEARCH)
 
 
 
@@ -0,0 +1,60 @@
+import hashlib
+
+import config
+from prefilter import tokenize
+
+FINGERPRINT_BITS = 64
+BANDS = 4  # Fingerprints within 3 bits of each other share at least one of 4 bands exactly
+BAND_BITS = FINGERPRINT_BITS // BANDS
+SHINGLE_SIZE = 3
+
+# Only final verdicts are reused, pending or pre-filtered jobs are scored again
+REUSABLE_SUITABILITY = ("Yes", "No")
+
+
+def simhash(text: str) -> int:
+    """64 bit SimHash of the word 3-grams of a text, reposts with small edits get close fingerprints."""
+    words = tokenize(text)
+    shingles = [" ".join(words[index:index + SHINGLE_SIZE])
+                for index in range(max(1, len(words) - SHINGLE_SIZE + 1))]
+    totals = [0] * FINGERPRINT_BITS
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(FINGERPRINT_BITS):
+            totals[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, total in enumerate(totals) if total > 0)
+
+
+def bands(fingerprint: int) -> list:
+    return [fingerprint >> (band * BAND_BITS) & ((1 << BAND_BITS) - 1) for band in range(BANDS)]
+
+
+def hamming_distance(first: int, second: int) -> int:
+    return bin(first ^ second).count("1")
+
+
+def find_near_duplicate(store, job_id: str, description: str):
+    """Return (job_id, suitability, llm response, resume path) of an earlier posting of the same job, or None."""
+    if config.near_duplicates.lower() != "yes" or not description.strip():
+        return None
+    fingerprint = simhash(description)
+    best = None
+    for candidate_id, candidate in store.fingerprint_candidates(bands(fingerprint)):
+        if candidate_id == job_id:
+            continue
+        distance = hamming_distance(fingerprint, candidate)
+        if distance <= config.near_duplicate_distance and (best is None or distance < best[1]):
+            best = (candidate_id, distance)
+    if best is None:
+        return None
+    result = store.llm_result(best[0])
+    if result is None or result[0] not in REUSABLE_SUITABILITY:
+        return None
+    return (best[0],) + result
+
+
+def remember_fingerprint(store, job_id: str, description: str) -> None:
+    """Index the description of a stored job so later reposts of it are recognised."""
+    if config.near_duplicates.lower() == "yes" and description and description.strip():
+        fingerprint = simhash(description)
+        store.add_fingerprint(job_id, fingerprint, bands(fingerprint))
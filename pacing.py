@@ -0,0 +1,112 @@
+import random
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+import config
+import tracing
+
+# Humanization delays in seconds (min, max) for each kind of action. They are added on top of the
+# readiness waits below, which only last until the page is actually ready.
+#   keystroke  between typed characters
+#   action     between the steps of a search (typing, clearing, clicking)
+#   page       after a results page or the homepage has loaded
+#   click      after the details of a clicked job have loaded
+#   popup      after a key is sent to close a popup
+PACING_PROFILES = {
+    "human": {"keystroke": (0.05, 0.2), "action": (0.3, 1.0), "page": (0.5, 1.5), "click": (0.5, 1.2),
+              "popup": (0.2, 0.5)},
+    "fast": {"keystroke": (0.0, 0.02), "action": (0.05, 0.2), "page": (0.1, 0.4), "click": (0.1, 0.3),
+             "popup": (0.05, 0.1)},
+    "none": {}  # No delays at all, for benchmarking
+}
+
+# Job list of a results page
+JOB_LIST_SELECTOR = "ul.css-zu9cdh"
+
+
+def delay_range(kind: str):
+    profile = PACING_PROFILES.get(config.pacing_profile.lower(), PACING_PROFILES["human"])
+    return profile.get(kind, (0.0, 0.0))
+
+
+def is_humanized() -> bool:
+    """False when the pacing profile has no delays, actions are then performed as fast as possible."""
+    return any(high > 0 for _, high in PACING_PROFILES.get(config.pacing_profile.lower(),
+                                                           PACING_PROFILES["human"]).values())
+
+
+def humanize(kind: str) -> None:
+    """Sleep for the humanization delay of an action, following config.pacing_profile."""
+    low, high = delay_range(kind)
+    if high > 0:
+        tracing.sleep(random.uniform(low, high), kind)
+
+
+def wait_for(driver, condition, timeout: float = None):
+    """Wait until condition(driver) is truthy and return its value, None when the timeout runs out."""
+    try:
+        with tracing.span(tracing.WAIT_SPAN):
+            return WebDriverWait(driver, timeout if timeout is not None else config.page_ready_timeout,
+                                 poll_frequency=0.1).until(condition)
+    except TimeoutException:
+        return None
+
+
+def is_stale(element) -> bool:
+    """True when the element has been removed from the page, e.g. because the page or pane was replaced."""
+    try:
+        element.is_enabled()
+        return False
+    except StaleElementReferenceException:
+        return True
+
+
+def job_list_loaded(previous=None):
+    """Condition: a job list is on the page, and it is not the previous one when given."""
+    def condition(driver):
+        if previous is not None and not is_stale(previous):
+            return False
+        elements = driver.find_elements(By.CSS_SELECTOR, JOB_LIST_SELECTOR)
+        return elements[0] if elements else False
+    return condition
+
+
+def job_details_loaded(job_id: str, previous=None, previous_text: str = None):
+    """Condition: the description of the clicked job is shown.
+
+    Clicking a card puts its ID in the URL (vjk= on the results page, jk= on a job page), but Indeed
+    updates the URL before the details pane is rendered again. With a previous description element the
+    URL is therefore only a precondition: the element must also be replaced or show another text than
+    previous_text, read before the click.
+    """
+    def condition(driver):
+        if previous is not None:
+            try:
+                if f"jk={job_id}" not in driver.current_url:
+                    return False
+            except WebDriverException:
+                return False
+            if not is_stale(previous):
+                try:
+                    if previous.text == previous_text:
+                        return False
+                except StaleElementReferenceException:
+                    pass
+        elements = driver.find_elements(By.ID, "jobDescriptionText")
+        try:
+            return elements[0] if elements and elements[0].text.strip() else False
+        except StaleElementReferenceException:
+            return False
+    return condition
+
+
+def element_hidden(element):
+    """Condition: the element is removed or no longer displayed."""
+    def condition(driver):
+        try:
+            return not element.is_displayed()
+        except StaleElementReferenceException:
+            return True
+    return condition
@@ -0,0 +1,113 @@
+import math
+import re
+import threading
+import zlib
+
+import config
+
+# Suitability stored for jobs that were too far from the profile to be sent to ChatGPT
+PRE_FILTERED = "Pre-filtered"
+
+HASH_BUCKETS = 2 ** 20
+
+# Words carrying no information about the job itself
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is", "it", "of", "on",
+    "or", "our", "that", "the", "this", "to", "we", "will", "with", "you", "your", "all", "can", "who", "their",
+    "they", "us", "not", "but", "if", "into", "about", "within", "across", "more", "other", "also", "any", "per"
+}
+
+
+def tokenize(text: str) -> list:
+    """Lower case words, keeping names like c++, c# and node.js in one piece."""
+    words = (word.strip(".") for word in re.findall(r'[a-z0-9][a-z0-9+#.]*', text.lower()))
+    return [word for word in words if word and word not in STOP_WORDS]
+
+
+def hashed_ngrams(text: str) -> dict:
+    """Count the hashed unigrams and bigrams of a text as {bucket: count}."""
+    words = tokenize(text)
+    grams = words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+    counts = {}
+    for gram in grams:
+        bucket = zlib.crc32(gram.encode('utf-8')) % HASH_BUCKETS
+        counts[bucket] = counts.get(bucket, 0) + 1
+    return counts
+
+
+class SimilarityFilter:
+    """TF-IDF cosine similarity between the profile and job descriptions over hashed n-grams.
+
+    Document frequencies are collected from the profile and every job description scored so far, so the
+    terms every posting shares (benefits, "apply now"...) weigh less as the run goes on.
+    """
+
+    def __init__(self, profile: str) -> None:
+        self.lock = threading.Lock()
+        self.document_count = 0
+        self.document_frequency = {}
+        self.profile_counts = hashed_ngrams(profile)
+        self._add_documents([self.profile_counts])
+
+    def _add_documents(self, documents: list) -> None:
+        for counts in documents:
+            self.document_count += 1
+            for bucket in counts:
+                self.document_frequency[bucket] = self.document_frequency.get(bucket, 0) + 1
+
+    def _weights(self, counts: dict) -> dict:
+        weights = {}
+        for bucket, count in counts.items():
+            idf = math.log((1 + self.document_count) / (1 + self.document_frequency.get(bucket, 0))) + 1
+            weights[bucket] = (1 + math.log(count)) * idf
+        return weights
+
+    def similarities(self, descriptions: list) -> list:
+        """Return the cosine similarity of each description to the profile, scoring them as one batch."""
+        documents = [hashed_ngrams(description) for description in descriptions]
+        with self.lock:
+            self._add_documents(documents)
+            profile = self._weights(self.profile_counts)
+            profile_norm = math.sqrt(sum(weight * weight for weight in profile.values()))
+            scores = []
+            for counts in documents:
+                weights = self._weights(counts)
+                norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+                if not norm or not profile_norm:
+                    scores.append(0.0)
+                    continue
+                dot = sum(weight * profile[bucket] for bucket, weight in weights.items() if bucket in profile)
+                scores.append(dot / (norm * profile_norm))
+        return scores
+
+
+_filter = None
+_filter_lock = threading.Lock()
+
+
+def get_similarity_filter():
+    """Return the shared filter, or None when the pre-filter is turned off in config.py."""
+    global _filter
+    if config.prefilter.lower() != "yes":
+        return None
+    with _filter_lock:
+        if _filter is None:
+            _filter = SimilarityFilter(config.profile)
+        return _filter
+
+
+def prefilter_jobs(records: list):
+    """Split job records into (records to send to ChatGPT, {job_id: pre-filtered verdict})."""
+    similarity_filter = get_similarity_filter()
+    if similarity_filter is None or not records:
+        return records, {}
+    kept = []
+    verdicts = {}
+    scores = similarity_filter.similarities([record["job_description"] for record in records])
+    for record, score in zip(records, scores):
+        if score < config.prefilter_threshold:
+            print(f"Job {record['job_id']} pre-filtered, similarity to the profile {score:.3f}")
+            verdicts[record["job_id"]] = {"suitable": PRE_FILTERED, "similarity": round(score, 3)}
+        else:
+            kept.append(record)
+    return kept, verdicts
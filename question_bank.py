@@ -0,0 +1,175 @@
+import re
+import threading
+from difflib import SequenceMatcher, get_close_matches
+
+import config
+from answer_memory import normalize_label
+
+# Words that say nothing about which question is asked, left out of the index
+STOPWORDS = {"a", "an", "and", "any", "are", "be", "been", "can", "do", "does", "for", "have", "i", "in", "is", "it",
+             "me", "my", "of", "on", "or", "please", "the", "this", "to", "what", "when", "which", "will", "with",
+             "you", "your"}
+
+YES_WORDS = {"yes", "y", "true", "agree", "accept", "checked"}
+NO_WORDS = {"no", "n", "false", "disagree", "decline", "unchecked"}
+
+# Field types answered with the value as it is written in the profile
+TEXT_TYPES = {"text", "textarea", "email", "tel", "url", "search", "date"}
+
+
+def stem(word: str) -> str:
+    """Light stemming so "job's", "jobs" and "job" or "authorised" and "authorized" share a token."""
+    word = word.replace("isation", "ization").replace("ised", "ized")
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def question_tokens(label: str) -> frozenset:
+    return frozenset(stem(word) for word in normalize_label(label).split() if word not in STOPWORDS)
+
+
+def parse_profile_answers(text: str) -> list:
+    """Return the (question, answer) pairs of the "question: answer" lines of profile_answer_questions.
+
+    Lines without a colon are statements about the candidate, they stay in the OpenAI prompt only.
+    """
+    pairs = []
+    for line in text.splitlines():
+        line = line.strip().lstrip("-•").strip()
+        if ":" not in line or "://" in line:
+            continue
+        question, answer = (part.strip() for part in line.split(":", 1))
+        if question and answer:
+            pairs.append((question, answer))
+    return pairs
+
+
+def yes_no(answer: str):
+    """"Yes" or "No" when the answer starts with one of them, otherwise None."""
+    words = normalize_label(answer).split()
+    if words and words[0] in YES_WORDS:
+        return "Yes"
+    if words and words[0] in NO_WORDS:
+        return "No"
+    return None
+
+
+def match_choice(answer: str, choices: list):
+    """Return the choice matching an answer: same text, same yes/no polarity or a close spelling."""
+    normalized = [normalize_label(choice) for choice in choices]
+    if normalize_label(answer) in normalized:
+        return choices[normalized.index(normalize_label(answer))]
+    polarity = yes_no(answer)
+    if polarity is not None:
+        matches = [choice for choice in choices if yes_no(choice) == polarity]
+        return matches[0] if len(matches) == 1 else None
+    match = get_close_matches(normalize_label(answer), normalized, n=1, cutoff=0.75)
+    if match:
+        return choices[normalized.index(match[0])]
+    # A choice contained in the answer, e.g. "Bachelors" for "Bachelors degree in Computer Science"
+    contained = [choice for choice, label in zip(choices, normalized)
+                 if label and re.search(rf'\b{re.escape(label)}\b', normalize_label(answer))]
+    return contained[0] if len(contained) == 1 else None
+
+
+class QuestionBank:
+    """Answers application questions from the "question: answer" lines of the profile, without OpenAI.
+
+    Questions are indexed by their normalized tokens. A field label is scored against the questions sharing
+    at least one token with it (Dice coefficient of the token sets, checked with the character similarity of
+    the normalized labels), and only a match scoring at least the threshold is used. The answer is then
+    resolved to the field: a radio option or dropdown choice, a checkbox state or a number.
+    """
+
+    def __init__(self, text: str, threshold: float = 0.75) -> None:
+        self.source = text
+        self.threshold = threshold
+        self.entries = []
+        self.exact = {}
+        self.index = {}
+        for question, answer in parse_profile_answers(text):
+            entry = (normalize_label(question), question_tokens(question), answer)
+            self.exact.setdefault(entry[0], answer)
+            for token in entry[1]:
+                self.index.setdefault(token, []).append(len(self.entries))
+            self.entries.append(entry)
+
+    def find(self, label: str):
+        """Return the answer of the question best matching a field label, None without a confident match."""
+        if not label:
+            return None
+        normalized = normalize_label(label)
+        if normalized in self.exact:
+            return self.exact[normalized]
+        tokens = question_tokens(label)
+        candidates = {position for token in tokens for position in self.index.get(token, [])}
+        best, best_score = None, 0.0
+        for position in candidates:
+            question, entry_tokens, answer = self.entries[position]
+            score = 2 * len(tokens & entry_tokens) / (len(tokens) + len(entry_tokens))
+            if score > best_score and SequenceMatcher(None, normalized, question).ratio() >= 0.6:
+                best, best_score = answer, score
+        return best if best_score >= self.threshold else None
+
+    def resolve(self, field: dict, answer: str) -> dict:
+        """Turn an answer into the {field id: value} entries autofill_fields expects, empty when it does not fit."""
+        if "options" in field:
+            labels = [option["label"] or "" for option in field["options"]]
+            choice = match_choice(answer, labels)
+            if choice is None:
+                return {}
+            option = field["options"][labels.index(choice)]
+            return {option["id"]: option["label"]}
+        field_type = field["type"]
+        if field_type == "checkbox":
+            polarity = yes_no(answer)
+            return {field["id"]: "Checked" if polarity == "Yes" else "Unchecked"} if polarity else {}
+        if field_type == "select-one":
+            if field.get("choices"):
+                choice = match_choice(answer, field["choices"])
+                return {field["id"]: choice} if choice is not None else {}
+            return {field["id"]: answer}
+        if field_type == "number":
+            number = re.search(r'\d+(?:\.\d+)?', answer.replace(",", ""))
+            return {field["id"]: number.group(0)} if number else {}
+        if field_type in TEXT_TYPES:
+            return {field["id"]: answer}
+        return {}
+
+    def answer(self, form_fields: list):
+        """Split the form fields into answers from the profile and fields that still need another source.
+
+        Returns ({field_id: value}, unknown_fields) like AnswerMemory.recall, headings stay in unknown_fields.
+        """
+        known = {}
+        unknown_fields = []
+        for field in form_fields:
+            if "headings" in field:
+                unknown_fields.append(field)
+                continue
+            answer = self.find(field.get("label"))
+            values = self.resolve(field, answer) if answer is not None else {}
+            if values:
+                known.update(values)
+            else:
+                unknown_fields.append(field)
+        return known, unknown_fields
+
+
+_bank = None
+_bank_lock = threading.Lock()
+
+
+def get_question_bank():
+    """Return the question bank of config.profile_answer_questions, or None when it is turned off in config.py."""
+    global _bank
+    if config.question_bank.lower() != "yes":
+        return None
+    with _bank_lock:
+        if _bank is None or _bank.source != config.profile_answer_questions \
+                or _bank.threshold != config.question_bank_threshold:
+            _bank = QuestionBank(config.profile_answer_questions, config.question_bank_threshold)
+        return _bank
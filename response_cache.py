@@ -0,0 +1,100 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+
+import config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access);
+"""
+
+
+def cache_key(*parts) -> str:
+    """Hash the parts of a request (model, prompt template, profile, job description...) into a cache key."""
+    normalized = [re.sub(r'\s+', ' ', part).strip() if isinstance(part, str) else part for part in parts]
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache of OpenAI responses with LRU and TTL eviction."""
+
+    def __init__(self, db_path: str, max_entries: int = 5000, ttl_days: float = 30) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl_days * 24 * 3600
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+
+    def get(self, key: str):
+        """Return the cached response for the key, or None if missing or expired."""
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute("SELECT response, created_at FROM responses WHERE key = ?",
+                                          (key,)).fetchone()
+            if row is None or (self.ttl and now - row[1] > self.ttl):
+                self.misses += 1
+                return None
+            self.connection.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.connection.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        now = time.time()
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, response, now, now))
+            self.evict(now)
+            self.connection.commit()
+
+    def evict(self, now: float = None) -> None:
+        """Drop expired entries, then the least recently used ones above max_entries."""
+        now = now or time.time()
+        with self.lock:
+            if self.ttl:
+                self.connection.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            count = self.connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                self.connection.execute(
+                    """DELETE FROM responses WHERE key IN
+                       (SELECT key FROM responses ORDER BY last_access LIMIT ?)""",
+                    (count - self.max_entries,))
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Return the shared cache, or None when caching is turned off in config.py."""
+    global _cache
+    if config.openai_cache.lower() != "yes":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(config.openai_cache_db, config.openai_cache_max_entries,
+                                   config.openai_cache_ttl_days)
+        return _cache
@@ -0,0 +1,185 @@
+import io
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from xml.sax.saxutils import escape
+
+from docx import Document
+from docx.opc.constants import CONTENT_TYPE as CT
+from docx.oxml.ns import qn
+from docx.oxml import OxmlElement
+from docx.shared import Pt
+from docx.text.paragraph import Paragraph
+
+import config
+from tracing import traced
+
+# Parts of the document searched for placeholders: the body (with its tables and text boxes), headers and footers
+TEMPLATE_CONTENT_TYPES = (CT.WML_DOCUMENT_MAIN, CT.WML_HEADER, CT.WML_FOOTER)
+
+# Text put in place of a placeholder paragraph while the template is compiled
+SLOT_TOKEN = "@@RESUME_SLOT_{}@@"
+SLOT_PATTERN = re.compile(r'<w:t(?: [^>]*)?>@@RESUME_SLOT_(\d+)@@</w:t>')
+
+# Characters that are not allowed in XML 1.0
+INVALID_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def format_paragraph(paragraph) -> None:
+    """Set the runs of a paragraph to the configured font, size and boldness."""
+    for run in paragraph.runs:
+        run.font.name = config.font
+        run.font.size = Pt(config.size)
+        run.font.bold = config.bold
+        # Ensure the font for each run by modifying the font element
+        rFonts = OxmlElement('w:rFonts')
+        rFonts.set(qn('w:ascii'), config.font)
+        rFonts.set(qn('w:hAnsi'), config.font)
+        run._r.get_or_add_rPr().append(rFonts)
+
+
+def run_text_xml(text: str) -> str:
+    """Return the run content of a text, with tabs and line breaks like python-docx's Run.text setter."""
+    pieces = []
+    for part in re.split(r'(\t|\r\n|\n|\r)', INVALID_XML_CHARS.sub('', text)):
+        if part == "\t":
+            pieces.append("<w:tab/>")
+        elif part in ("\r\n", "\n", "\r"):
+            pieces.append("<w:br/>")
+        elif part:
+            pieces.append(f'<w:t xml:space="preserve">{escape(part)}</w:t>')
+    return "".join(pieces)
+
+
+class ResumeTemplate:
+    """A resume template parsed once, with the paragraphs holding placeholders indexed.
+
+    Compiling replaces the text of every placeholder paragraph by a numbered slot, applies the resume
+    font to it and saves the document once. The XML parts holding slots are kept split around them and
+    every other part of the .docx is kept as raw bytes, so rendering a resume only joins strings and
+    writes one zip file, without parsing the template again.
+    """
+
+    def __init__(self, template_path: str, placeholders: dict = None) -> None:
+        self.template_path = template_path
+        self.placeholders = list((placeholders or config.placeholders).values())
+        self.slots = []  # Original text of each placeholder paragraph
+        self.entries = []  # (zip info, raw bytes or a list alternating XML text and slot numbers)
+        self._compile()
+
+    def _compile(self) -> None:
+        with open(self.template_path, mode='rb') as file:
+            document = Document(io.BytesIO(file.read()))
+
+        for part in document.part.package.iter_parts():
+            if part.content_type not in TEMPLATE_CONTENT_TYPES:
+                continue
+            for p in list(part.element.iter(qn('w:p'))):
+                paragraph = Paragraph(p, document)
+                text = paragraph.text
+                if not any(placeholder in text for placeholder in self.placeholders):
+                    continue
+                paragraph.text = SLOT_TOKEN.format(len(self.slots))
+                format_paragraph(paragraph)
+                self.slots.append(text)
+
+        compiled = io.BytesIO()
+        document.save(compiled)
+        with zipfile.ZipFile(compiled) as archive:
+            for info in archive.infolist():
+                data = archive.read(info)
+                if b"@@RESUME_SLOT_" in data:
+                    segments = SLOT_PATTERN.split(data.decode('utf-8'))
+                    # Odd positions hold the slot numbers
+                    self.entries.append((info, [int(segment) if index % 2 else segment
+                                                for index, segment in enumerate(segments)]))
+                else:
+                    self.entries.append((info, data))
+
+    def render(self, values: dict, output_path: str) -> str:
+        """Write a resume with each placeholder replaced by its value in values and return its path."""
+        slot_xml = []
+        for text in self.slots:
+            for placeholder, value in values.items():
+                text = text.replace(placeholder, value)
+            slot_xml.append(run_text_xml(text))
+
+        with zipfile.ZipFile(output_path, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for info, data in self.entries:
+                if isinstance(data, list):
+                    data = "".join(slot_xml[segment] if index % 2 else segment
+                                   for index, segment in enumerate(data)).encode('utf-8')
+                archive.writestr(info.filename, data, compress_type=zipfile.ZIP_DEFLATED)
+        return output_path
+
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def get_resume_template(template_path: str = None) -> ResumeTemplate:
+    """Return the compiled template, compiled again only when the template file changes."""
+    template_path = template_path or config.template_path
+    modified = os.path.getmtime(template_path)
+    with _templates_lock:
+        cached = _templates.get(template_path)
+        if cached is None or cached[0] != modified:
+            cached = (modified, ResumeTemplate(template_path))
+            _templates[template_path] = cached
+        return cached[1]
+
+
+@traced("resume_render")
+def render_resume(template_path: str, values: dict, output_path: str) -> str:
+    """Render one resume, runs in the worker processes of ResumeRenderService."""
+    return get_resume_template(template_path).render(values, output_path)
+
+
+class ResumeRenderService:
+    """Renders resumes on a process pool so scraping and scoring never wait for a resume to be written.
+
+    submit() returns a Future of the output path, every job is written to its own file. With workers = 0
+    resumes are rendered in the calling thread and an already completed Future is returned.
+    """
+
+    def __init__(self, template_path: str = None, workers: int = 2) -> None:
+        self.template_path = template_path or config.template_path
+        self.workers = max(0, workers)
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def submit(self, data: dict, output_path: str):
+        """Queue the resume of a suitable job, None when the answer has no profile or skills."""
+        if "profile" not in data or "skills" not in data:
+            print("Invalid JSON data")
+            return None
+        values = {config.placeholders["profile_placeholder"]: data["profile"],
+                  config.placeholders["skills_placeholder"]: data["skills"]}
+
+        if self.workers == 0:
+            future = Future()
+            try:
+                future.set_result(render_resume(self.template_path, values, output_path))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        with self.lock:
+            if self.executor is None:
+                # Every worker process compiles the template once when it starts. The processes are spawned:
+                # a fork from this multithreaded process could copy a lock held by another thread, e.g. the
+                # tracing lock, and deadlock in the child.
+                self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=get_resume_template,
+                                                    initargs=(self.template_path,),
+                                                    mp_context=multiprocessing.get_context("spawn"))
+            return self.executor.submit(render_resume, self.template_path, values, output_path)
+
+    def close(self) -> None:
+        """Wait for the queued resumes to be written and stop the worker processes."""
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True)
+                self.executor = None
@@ -0,0 +1,89 @@
+import queue
+import threading
+
+# Marker put on the queue to tell a worker to stop
+_STOP = object()
+
+
+class ScoringPipeline:
+    """Bounded producer/consumer queue between the browser loop and the LLM scoring workers.
+
+    The browser thread calls submit() with a job record and continues scraping while a pool of worker
+    threads runs process_jobs (scoring, resume rendering and storing) on queued jobs. When the queue
+    is full submit() blocks, so the faster stage waits for the slower one instead of piling up work.
+    Workers hand up to batch_size queued jobs at once to process_jobs, waiting at most batch_wait
+    seconds for a batch to fill up. release_job(job_id) is called for every job of a failed batch, so it
+    is no longer counted as known for the rest of the run.
+    """
+
+    def __init__(self, process_jobs, workers: int = 4, queue_size: int = 16, batch_size: int = 1,
+                 batch_wait: float = 2.0, release_job=None) -> None:
+        self.process_jobs = process_jobs
+        self.release_job = release_job
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait
+        self.jobs = queue.Queue(maxsize=max(1, queue_size))
+        self.threads = []
+        self.processed = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+
+    def start(self) -> None:
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"scoring-worker-{index}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        print(f"Started {self.workers} scoring workers")
+
+    def submit(self, record: dict) -> None:
+        """Queue a job record for scoring, blocks while the queue is full."""
+        self.jobs.put(record)
+
+    def _next_batch(self):
+        """Block for one job, then collect more until the batch is full or batch_wait runs out."""
+        batch = []
+        stop = False
+        item = self.jobs.get()
+        while True:
+            if item is _STOP:
+                stop = True
+                break
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                break
+            try:
+                item = self.jobs.get(timeout=self.batch_wait)
+            except queue.Empty:
+                break
+        return batch, stop
+
+    def _worker(self) -> None:
+        while True:
+            batch, stop = self._next_batch()
+            try:
+                if batch:
+                    self.process_jobs(batch)
+                    with self.lock:
+                        self.processed += len(batch)
+            except Exception as e:
+                print(f"Scoring worker failed for jobs {[record.get('job_id') for record in batch]}: {e}")
+                with self.lock:
+                    self.failed += len(batch)
+                if self.release_job is not None:
+                    for record in batch:
+                        self.release_job(record.get("job_id"))
+            finally:
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self.jobs.task_done()
+            if stop:
+                return
+
+    def close(self) -> None:
+        """Wait for every queued job to finish and stop the workers."""
+        for _ in self.threads:
+            self.jobs.put(_STOP)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        print(f"Scoring pipeline finished: {self.processed} jobs processed, {self.failed} failed")
@@ -0,0 +1,78 @@
+import threading
+
+import config
+
+# Rough size of a token in English text, used where the real count is not known
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def trim_to_tokens(text: str, budget: int = None) -> str:
+    """Cut a job description down to about budget tokens, at a word boundary. A budget of 0 keeps it whole."""
+    budget = config.description_token_budget if budget is None else budget
+    limit = budget * CHARS_PER_TOKEN
+    if not budget or len(text) <= limit:
+        return text
+    trimmed = text[:limit]
+    if " " in trimmed:
+        trimmed = trimmed[:trimmed.rindex(" ")]
+    return trimmed
+
+
+class TokenUsage:
+    """Counts the tokens sent to and received from OpenAI per call site, and the tokens saved by caching.
+
+    Prompt tokens the provider served from its prompt cache come from the usage field of the response,
+    requests answered by the local response cache are counted with an estimate of their prompt size.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.sites = {}
+
+    def _site(self, site: str) -> dict:
+        return self.sites.setdefault(site, {"requests": 0, "prompt_tokens": 0, "cached_prompt_tokens": 0,
+                                            "completion_tokens": 0, "local_cache_hits": 0,
+                                            "local_cache_saved_tokens": 0})
+
+    def record(self, site: str, usage) -> None:
+        """Add the usage field of a chat completion response."""
+        usage = usage or {}
+        details = usage.get("prompt_tokens_details") or {}
+        with self.lock:
+            counts = self._site(site)
+            counts["requests"] += 1
+            counts["prompt_tokens"] += usage.get("prompt_tokens", 0)
+            counts["cached_prompt_tokens"] += details.get("cached_tokens", 0)
+            counts["completion_tokens"] += usage.get("completion_tokens", 0)
+
+    def record_cache_hit(self, site: str, prompt_tokens: int) -> None:
+        """Count a request answered by the local response cache instead of OpenAI."""
+        with self.lock:
+            counts = self._site(site)
+            counts["local_cache_hits"] += 1
+            counts["local_cache_saved_tokens"] += prompt_tokens
+
+    def report(self) -> str:
+        with self.lock:
+            if not self.sites:
+                return "OpenAI token usage: no requests"
+            lines = ["OpenAI token usage:"]
+            for site, counts in sorted(self.sites.items()):
+                prompt = counts["prompt_tokens"]
+                cached_share = counts["cached_prompt_tokens"] / prompt if prompt else 0.0
+                lines.append(f"  {site}: {counts['requests']} requests, {prompt} prompt tokens "
+                             f"({counts['cached_prompt_tokens']} served from the prompt cache, {cached_share:.0%}), "
+                             f"{counts['completion_tokens']} completion tokens, {counts['local_cache_hits']} "
+                             f"local cache hits saving about {counts['local_cache_saved_tokens']} prompt tokens")
+            return "\n".join(lines)
+
+
+_usage = TokenUsage()
+
+
+def get_token_usage() -> TokenUsage:
+    return _usage
@@ -0,0 +1,134 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import config
+
+# Spans counted as deliberate pauses and as waiting for the page in the report
+SLEEP_SPAN = "sleep"
+WAIT_SPAN = "wait"
+# One span per stored job, used for the jobs per minute figure
+JOB_SPAN = "finish_job"
+
+_local = threading.local()
+_lock = threading.Lock()
+_file = None
+
+
+def enabled() -> bool:
+    return config.tracing.lower() == "yes"
+
+
+def run_id() -> str:
+    """Identifies the spans of one run, resume worker processes inherit it from the main process."""
+    if "TRACE_RUN_ID" not in os.environ:
+        os.environ["TRACE_RUN_ID"] = time.strftime('%Y%m%d-%H%M%S')
+    return os.environ["TRACE_RUN_ID"]
+
+
+def _write(entry: dict) -> None:
+    global _file
+    line = json.dumps(entry) + "\n"
+    with _lock:
+        if _file is None:
+            _file = open(config.trace_file, mode='a', encoding='utf-8')
+        _file.write(line)
+        _file.flush()
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time the enclosed block and write it to the trace file with the name of its parent span."""
+    if not enabled():
+        yield
+        return
+    stack = _local.__dict__.setdefault("stack", [])
+    parent = stack[-1] if stack else None
+    stack.append(name)
+    start = time.time()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stack.pop()
+        _write({"run": run_id(), "name": name, "parent": parent, "start": round(start, 3),
+                "duration": round(time.perf_counter() - started, 4), "thread": threading.current_thread().name,
+                "pid": os.getpid(), **attrs})
+
+
+def traced(name: str = None):
+    """Decorator putting every call of a function in a span."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name or function.__name__):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def sleep(seconds: float, kind: str = None) -> None:
+    """time.sleep that is reported as a deliberate pause."""
+    with span(SLEEP_SPAN, kind=kind):
+        time.sleep(seconds)
+
+
+class Stages:
+    """Consecutive spans for the steps of a long function, each next() ends the previous step."""
+
+    def __init__(self, prefix: str) -> None:
+        self.prefix = prefix
+        self.current = None
+
+    def next(self, name: str) -> None:
+        self.close()
+        self.current = span(f"{self.prefix}.{name}")
+        self.current.__enter__()
+
+    def close(self) -> None:
+        if self.current is not None:
+            self.current.__exit__(None, None, None)
+            self.current = None
+
+
+def percentile(values: list, share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(share * (len(ordered) - 1))))]
+
+
+def summarize(trace_path: str, run: str = None) -> str:
+    """Per stage p50/p95/max of one run of a trace file (the last one by default), jobs per minute and pauses."""
+    entries = []
+    with open(trace_path, mode='r', encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                entries.append(json.loads(line))
+    if not entries:
+        return "The trace file is empty"
+    run = run or entries[-1]["run"]
+    entries = [entry for entry in entries if entry["run"] == run]
+
+    durations = {}
+    for entry in entries:
+        durations.setdefault(entry["name"], []).append(entry["duration"])
+    wall = max(entry["start"] + entry["duration"] for entry in entries) - min(entry["start"] for entry in entries)
+
+    lines = [f"Run {run}: {wall:.1f} s", f"{'stage':<40}{'count':>7}{'total s':>10}{'p50 s':>9}{'p95 s':>9}{'max s':>9}"]
+    for name, values in sorted(durations.items(), key=lambda item: -sum(item[1])):
+        lines.append(f"{name:<40}{len(values):>7}{sum(values):>10.1f}{percentile(values, 0.5):>9.2f}"
+                     f"{percentile(values, 0.95):>9.2f}{max(values):>9.2f}")
+    jobs = len(durations.get(JOB_SPAN, []))
+    lines.append(f"Jobs: {jobs}, {jobs / (wall / 60) if wall else 0:.1f} per minute")
+    lines.append(f"Deliberate sleeps: {sum(durations.get(SLEEP_SPAN, [])):.1f} s, "
+                 f"waiting for pages: {sum(durations.get(WAIT_SPAN, [])):.1f} s")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # Usage: python tracing.py [trace.jsonl] [run]
+    print(summarize(sys.argv[1] if len(sys.argv) > 1 else config.trace_file,
+                    sys.argv[2] if len(sys.argv) > 2 else None))